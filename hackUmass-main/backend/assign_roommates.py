@@ -0,0 +1,86 @@
+#!/usr/bin/env python3
+"""
+Offline roommate assignment for a whole applicant pool
+Pairs every double-room applicant with at most one roommate (assign_double_rooms) and writes the pairs to CSV
+"""
+
+import sys
+import os
+import csv
+import json
+import argparse
+sys.path.insert(0, os.path.dirname(__file__))
+
+from HackUmass_back_end import (
+    CandidateStore,
+    RoommateAssignment,
+    assign_double_rooms,
+    get_candidate_store,
+    get_profile_student_year,
+    load_roommate_data,
+)
+from synthetic_applicants import load_applicant_store
+
+CSV_COLUMNS = ['userId', 'name', 'roommateUserId', 'roommateName', 'dormArea', 'studentYear', 'compatibilityScore']
+
+
+def load_store(workbook: str = None, applicants: str = None) -> CandidateStore:
+    """The shared candidate store, or a store of the applicants in `workbook` or a synthetic_applicants.py pool."""
+    if applicants:
+        return CandidateStore(load_applicant_store(applicants).profiles.rows())
+    if not workbook:
+        return get_candidate_store()
+    cache_dir = os.path.join(os.path.dirname(os.path.abspath(workbook)), '.roommate_data_cache')
+    return CandidateStore(load_roommate_data(workbook, cache_dir).profiles.rows())
+
+
+def write_assignment_csv(path: str, store: CandidateStore, assignment: RoommateAssignment) -> None:
+    """One row per pair, then one row per unassigned applicant with blank roommate columns."""
+    profiles = store.profiles
+    with open(path, 'w', newline='', encoding='utf-8') as f:
+        writer = csv.writer(f)
+        writer.writerow(CSV_COLUMNS)
+        for a, b, score in assignment.pairs:
+            profile, roommate = profiles[a], profiles[b]
+            writer.writerow([profile.get('userId'), profile.get('name'), roommate.get('userId'), roommate.get('name'),
+                             profile.get('dormArea'), get_profile_student_year(profile), score])
+        for position in assignment.unassigned:
+            profile = profiles[position]
+            writer.writerow([profile.get('userId'), profile.get('name'), '', '',
+                             profile.get('dormArea'), get_profile_student_year(profile), ''])
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Assign double-room roommates across the whole applicant pool")
+    parser.add_argument('--workbook', help="Applicant workbook to assign (default: the candidate store the API uses)")
+    parser.add_argument('--applicants', help="Directory written by synthetic_applicants.py to assign instead")
+    parser.add_argument('--output', help="CSV file for the pairs and unassigned applicants")
+    parser.add_argument('--min-score', type=int, default=None, help="Lowest compatibility allowed for a pair (default: 75)")
+    parser.add_argument('--exact-max-block', type=int, default=None,
+                        help="Largest area/year group paired exactly; larger groups use the fast heuristic "
+                             "(default: ASSIGNMENT_EXACT_MAX_BLOCK, 500)")
+    parser.add_argument('--json', action='store_true', help="Print the run stats as JSON")
+    args = parser.parse_args()
+
+    store = load_store(args.workbook, args.applicants)
+    assignment = assign_double_rooms(store, args.min_score, args.exact_max_block)
+    if args.output:
+        write_assignment_csv(args.output, store, assignment)
+
+    if args.json:
+        print(json.dumps(assignment.stats))
+        sys.exit(0)
+
+    stats = assignment.stats
+    print("\n" + "="*60)
+    print("ROOMMATE ASSIGNMENT")
+    print("="*60)
+    print(f"   Double-room applicants: {stats['students']} ({stats['skipped']} other rows skipped)")
+    print(f"   Pairs:                  {stats['pairs']} ({stats['unassigned']} applicants unassigned)")
+    print(f"   Total compatibility:    {stats['totalCompatibility']} (upper bound {stats['upperBound']})")
+    print(f"   Min / mean per pair:    {stats['minCompatibility']} / {stats['meanCompatibility']}")
+    print(f"   Solved in:              {stats['seconds']:.2f} s ({stats['blocks']} area/year groups, {stats['classes']} profile classes)")
+    print(f"   Exact / heuristic:      {stats['exactBlocks']} / {stats['heuristicBlocks']} groups")
+    if args.output:
+        print(f"   Written to:             {args.output}")
+    print("="*60 + "\n")
@@ -0,0 +1,141 @@
+#!/usr/bin/env python3
+"""
+Benchmark for the fallback scoring engine
+Compares the original if/elif chains against the table-driven scalar and batch scorers
+"""
+
+import sys
+import os
+import time
+import random
+import argparse
+from typing import Dict, Any
+sys.path.insert(0, os.path.dirname(__file__))
+
+from HackUmass_back_end import (
+    FALLBACK_TRAIT_VALUES,
+    batch_fallback_scores,
+    calculate_fallback_score,
+    encode_fallback_trait_array,
+)
+
+
+def legacy_fallback_score(profile_a: Dict[str, Any], profile_b: Dict[str, Any]) -> int:
+    """Original if/elif implementation of calculate_fallback_score, kept as the benchmark baseline."""
+    score = 80  # Start with a base score
+    
+    # Sleep schedule alignment (critical - 30 points)
+    sleep_a = profile_a.get('sleepSchedule', 'balanced')
+    sleep_b = profile_b.get('sleepSchedule', 'balanced')
+    if sleep_a == sleep_b:
+        score += 0  # Already good
+    elif (sleep_a == 'early-bird' and sleep_b == 'night-owl') or (sleep_a == 'night-owl' and sleep_b == 'early-bird'):
+        score -= 25  # Major conflict
+    else:
+        score -= 10  # Minor difference
+    
+    # Tidiness alignment (important - 20 points)
+    tidy_a = profile_a.get('tidiness', 'tidy')
+    tidy_b = profile_b.get('tidiness', 'tidy')
+    if tidy_a == tidy_b:
+        score += 0
+    elif (tidy_a == 'very-tidy' and tidy_b == 'messy') or (tidy_a == 'messy' and tidy_b == 'very-tidy'):
+        score -= 20  # Major conflict
+    else:
+        score -= 5  # Minor difference
+    
+    # Noise level alignment (important - 20 points)
+    noise_a = profile_a.get('noiseLevel', 'quiet')
+    noise_b = profile_b.get('noiseLevel', 'quiet')
+    if noise_a == noise_b:
+        score += 0
+    elif (noise_a == 'very-quiet' and noise_b == 'loud') or (noise_a == 'loud' and noise_b == 'very-quiet'):
+        score -= 20  # Major conflict
+    else:
+        score -= 5  # Minor difference
+    
+    # Social level alignment (moderate - 10 points)
+    social_a = profile_a.get('socialLevel', 'moderately-social')
+    social_b = profile_b.get('socialLevel', 'moderately-social')
+    if social_a == social_b:
+        score += 0
+    elif (social_a == 'minimal-social' and social_b == 'very-social') or (social_a == 'very-social' and social_b == 'minimal-social'):
+        score -= 10  # Moderate conflict
+    else:
+        score -= 3  # Minor difference
+    
+    # Ensure score is between 0 and 100
+    score = max(0, min(100, score))
+    
+    # Only return 75+ if there are no major conflicts
+    if score < 75:
+        # Check if it's due to major conflicts
+        if ((sleep_a == 'early-bird' and sleep_b == 'night-owl') or 
+            (tidy_a == 'very-tidy' and tidy_b == 'messy') or
+            (noise_a == 'very-quiet' and noise_b == 'loud')):
+            return 0  # Major incompatibility
+        else:
+            # Boost to 75 if only minor differences
+            return 75
+
+    return int(score)
+
+
+def make_trait_profiles(count: int, seed: int = 42):
+    """Random profiles covering the questionnaire answers for the four fallback traits."""
+    rng = random.Random(seed)
+    return [
+        {key: rng.choice(values) for key, values in FALLBACK_TRAIT_VALUES.items()}
+        for _ in range(count)
+    ]
+
+
+def time_call(func, repeat: int) -> float:
+    """Returns the best wall-clock time of `repeat` runs, in milliseconds."""
+    best = float('inf')
+    for _ in range(repeat):
+        start = time.perf_counter()
+        func()
+        best = min(best, time.perf_counter() - start)
+    return best * 1000
+
+
+def benchmark_fallback_scoring(num_candidates: int = 100000, repeat: int = 3) -> Dict[str, Any]:
+    """Scores one user against `num_candidates` profiles with each implementation."""
+    candidates = make_trait_profiles(num_candidates)
+    user = make_trait_profiles(1, seed=7)[0]
+    candidate_codes = encode_fallback_trait_array(candidates)
+
+    legacy = [legacy_fallback_score(user, c) for c in candidates]
+    table = [calculate_fallback_score(user, c) for c in candidates]
+    batch = batch_fallback_scores(user, candidate_codes).tolist()
+    if not (legacy == table == batch):
+        raise AssertionError("Fallback scorers disagree")
+
+    results = {
+        'candidates': num_candidates,
+        'legacy_if_elif_ms': time_call(lambda: [legacy_fallback_score(user, c) for c in candidates], repeat),
+        'table_scalar_ms': time_call(lambda: [calculate_fallback_score(user, c) for c in candidates], repeat),
+        'table_batch_ms': time_call(lambda: batch_fallback_scores(user, candidate_codes), repeat),
+    }
+    results['scalar_speedup'] = results['legacy_if_elif_ms'] / results['table_scalar_ms']
+    results['batch_speedup'] = results['legacy_if_elif_ms'] / results['table_batch_ms']
+    return results
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Benchmark the fallback scoring engine")
+    parser.add_argument('--candidates', type=int, default=100000, help="Number of candidates to score")
+    parser.add_argument('--repeat', type=int, default=3, help="Runs per implementation (best time is reported)")
+    args = parser.parse_args()
+
+    print("\n" + "="*60)
+    print("FALLBACK SCORING BENCHMARK")
+    print("="*60)
+
+    results = benchmark_fallback_scoring(args.candidates, args.repeat)
+    print(f"   Candidates:            {results['candidates']}")
+    print(f"   Legacy if/elif chains: {results['legacy_if_elif_ms']:.1f} ms")
+    print(f"   Table lookups:         {results['table_scalar_ms']:.1f} ms ({results['scalar_speedup']:.1f}x)")
+    print(f"   Batch table lookups:   {results['table_batch_ms']:.1f} ms ({results['batch_speedup']:.1f}x)")
+    print("="*60 + "\n")
@@ -0,0 +1,149 @@
+#!/usr/bin/env python3
+"""
+Benchmark for the matching pipeline at synthetic scale
+Times each stage of score_and_rank_matches (and the whole run, with the API stubbed out) against candidate stores
+of 1k to 1M profiles and writes the results as JSON, so runs can be compared release over release
+"""
+
+import sys
+import os
+import json
+import time
+import argparse
+import platform
+import statistics
+import subprocess
+from datetime import datetime, timezone
+from typing import Any, Callable, Dict, List
+sys.path.insert(0, os.path.dirname(__file__))
+
+import numpy as np
+
+import HackUmass_back_end as backend
+from synthetic_applicants import default_applicant_model, generate_applicants
+
+DEFAULT_SIZES = [1000, 10000, 100000, 1000000]
+BENCHMARK_VERSION = 2  # 2: candidates come from synthetic_applicants.py instead of uniform random traits
+
+# One user per room type; the double is recommended Orchard Hill, triples and quads search several areas
+BENCHMARK_USERS = [
+    {'userId': 'bench_double', 'name': 'Bench Double', 'major': 'Computer Science', 'roomType': 'double', 'studentYear': 'upperclassmen',
+     'sleepSchedule': 'balanced', 'tidiness': 'tidy', 'noiseLevel': 'quiet', 'socialLevel': 'moderately-social'},
+    {'userId': 'bench_triple', 'name': 'Bench Triple', 'major': 'Psychology', 'roomType': 'triple', 'studentYear': 'first-years',
+     'sleepSchedule': 'night-owl', 'tidiness': 'moderately-tidy', 'noiseLevel': 'moderate', 'socialLevel': 'very-social'},
+    {'userId': 'bench_quad', 'name': 'Bench Quad', 'major': 'Finance', 'roomType': 'quad', 'studentYear': 'upperclassmen',
+     'sleepSchedule': 'early-bird', 'tidiness': 'very-tidy', 'noiseLevel': 'very-quiet', 'socialLevel': 'minimal-social',
+     'alcoholPref': 'required'},
+]
+
+
+def stub_api_call(payload, schema, system_instruction, url, is_scoring=False):
+    """Stands in for make_api_call: answers instantly, so only the pipeline's own work is timed."""
+    return {'compatibilityScore': 85, 'confidenceLevel': 'High', 'reasoningSummary': 'stub', 'matchAdvice': 'stub'}
+
+
+def time_runs(func: Callable[[], Any], repeat: int) -> Dict[str, float]:
+    """Best and median wall-clock time of `repeat` runs, in milliseconds."""
+    runs = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        func()
+        runs.append((time.perf_counter() - start) * 1000)
+    return {'best_ms': round(min(runs), 3), 'median_ms': round(statistics.median(runs), 3), 'runs': repeat}
+
+
+def benchmark_size(num_candidates: int, repeat: int, seed: int, model=None) -> Dict[str, Any]:
+    """Builds a store of `num_candidates` synthetic applicants and times every stage against it."""
+    start = time.perf_counter()
+    backend.set_candidate_store(backend.CandidateStore(generate_applicants(num_candidates, seed, model)))
+    build_seconds = time.perf_counter() - start
+
+    user = BENCHMARK_USERS[0]
+    area = backend.get_dorm_recommendation(user)['recommendedArea']
+    year = backend.get_profile_student_year(user)
+    batch = backend.get_candidate_batch_from_db(user['userId'], [area], year)
+    scalar_candidates = [profile.to_dict() for profile in batch.profiles]
+    quick_scores = backend.batch_fallback_scores(user, batch.trait_codes)
+    filter_input = [backend.build_quick_match_result(candidate, int(score))
+                    for candidate, score in zip(batch.profiles, quick_scores.tolist())]
+
+    stages = {
+        'calculate_fallback_score': time_runs(lambda: [backend.calculate_fallback_score(user, c) for c in scalar_candidates], repeat),
+        'batch_fallback_scores': time_runs(lambda: backend.batch_fallback_scores(user, batch.trait_codes), repeat),
+        'get_dorm_recommendation': time_runs(lambda: [backend.get_dorm_recommendation(u) for u in BENCHMARK_USERS], repeat),
+        'get_all_profiles_from_db': time_runs(lambda: backend.get_all_profiles_from_db(user['userId'], [area], year), repeat),
+        'final_logistical_filter': time_runs(lambda: backend.final_logistical_filter(user, filter_input), repeat),
+        'find_alternative_matches': time_runs(lambda: backend.find_alternative_matches(user, user['userId']), repeat),
+    }
+
+    original_call, original_cache = backend.make_api_call, backend.get_score_cache()
+    backend.make_api_call = stub_api_call
+    try:
+        for room_user in BENCHMARK_USERS:
+            def run():
+                backend.set_score_cache(backend.ScoreCache(path=None))  # A cold cache, as for a first submission
+                backend.score_and_rank_matches(dict(room_user), room_user['userId'])
+            stages[f"score_and_rank_matches[{room_user['roomType']}]"] = time_runs(run, repeat)
+    finally:
+        backend.make_api_call = original_call
+        backend.set_score_cache(original_cache)
+
+    return {
+        'candidates': num_candidates,
+        'store_build_seconds': round(build_seconds, 3),
+        'retrieved_candidates': len(scalar_candidates),
+        'filter_input_matches': len(filter_input),
+        'stages': stages,
+    }
+
+
+def git_revision() -> str:
+    """Short commit hash of the checkout being benchmarked, or 'unknown' outside a git checkout."""
+    try:
+        return subprocess.run(['git', 'rev-parse', '--short', 'HEAD'], cwd=os.path.dirname(os.path.abspath(__file__)),
+                              capture_output=True, text=True, check=True).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return 'unknown'
+
+
+def run_benchmarks(sizes: List[int], repeat: int = 3, seed: int = 42) -> Dict[str, Any]:
+    """Every size's results plus what is needed to compare them with another run."""
+    original_store = backend.get_candidate_store()
+    model = default_applicant_model()
+    try:
+        results = []
+        for size in sizes:
+            results.append(benchmark_size(size, repeat, seed, model))
+            print(f"   {size:>9,} candidates: done", file=sys.stderr)
+    finally:
+        backend.set_candidate_store(original_store)
+    return {
+        'benchmark': 'matching_pipeline',
+        'version': BENCHMARK_VERSION,
+        'timestamp': datetime.now(timezone.utc).isoformat(timespec='seconds'),
+        'revision': git_revision(),
+        'environment': {'python': platform.python_version(), 'numpy': np.__version__, 'platform': platform.platform(),
+                        'cpus': os.cpu_count()},
+        'settings': {'repeat': repeat, 'seed': seed, 'llm_scoring_mode': backend.LLM_SCORING_MODE,
+                     'max_candidates_to_score': backend.MAX_CANDIDATES_TO_SCORE},
+        'results': results,
+    }
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Benchmark the matching pipeline at synthetic scale")
+    parser.add_argument('--sizes', default=','.join(str(size) for size in DEFAULT_SIZES),
+                        help="Comma-separated candidate store sizes (default: 1k, 10k, 100k, 1M)")
+    parser.add_argument('--repeat', type=int, default=3, help="Runs per stage (best and median are reported)")
+    parser.add_argument('--seed', type=int, default=42, help="Seed for the synthetic applicants")
+    parser.add_argument('--output', help="Write the JSON results here instead of to stdout")
+    args = parser.parse_args()
+
+    report = run_benchmarks([int(size) for size in args.sizes.split(',')], args.repeat, args.seed)
+    if args.output:
+        with open(args.output, 'w') as f:
+            json.dump(report, f, indent=2)
+        print(f"   Results written to {args.output}", file=sys.stderr)
+    else:
+        json.dump(report, sys.stdout, indent=2)
+        print()
@@ -0,0 +1,206 @@
+#!/usr/bin/env python3
+"""
+Local stand-in for the Gemini generateContent API, for load tests and benchmarks without real quota
+Answers with JSON that fits the request's responseSchema (MATCH_SCHEMA, MATCH_BATCH_SCHEMA, DORM_SCHEMA, ...),
+after a configurable latency, and injects timeouts, 429s, server errors and malformed JSON at configurable rates
+
+Point the backend at it with GEMINI_API_URL=http://127.0.0.1:8001/v1beta/models/gemini-2.5-pro:generateContent
+"""
+
+import sys
+import re
+import json
+import time
+import random
+import hashlib
+import argparse
+import threading
+from typing import Any, Dict, NamedTuple, Optional, Tuple
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+LATENCY_DISTRIBUTIONS = ('fixed', 'uniform', 'exponential', 'lognormal')
+OUTCOMES = ('ok', 'timeout', 'rate_limited', 'server_error', 'malformed')
+CONFIDENCE_LEVELS = ['High', 'Medium', 'Low']
+BATCH_USER_ID = re.compile(r'\(userId: ([^)]+)\)')
+
+
+class FakeGeminiConfig(NamedTuple):
+    latency_ms: float = 800.0  # Fixed value, mean (uniform, exponential) or median (lognormal)
+    latency_dist: str = 'lognormal'
+    latency_spread: float = 0.5  # +/- ms for uniform, sigma for lognormal; unused otherwise
+    timeout_rate: float = 0.0  # Requests that hang for hang_seconds before answering
+    rate_limit_rate: float = 0.0  # Requests answered 429 RESOURCE_EXHAUSTED
+    error_rate: float = 0.0  # Requests answered 500 INTERNAL
+    malformed_rate: float = 0.0  # Requests answered 200 with cut-off, unparseable JSON text
+    hang_seconds: float = 30.0  # Longer than the backend's INITIAL_TIMEOUT, so its read times out first
+    seed: Optional[int] = None
+
+
+class FakeGemini:
+    """Draws each request's latency and outcome, builds schema-valid answers and counts what it served."""
+
+    def __init__(self, config: FakeGeminiConfig):
+        if config.latency_dist not in LATENCY_DISTRIBUTIONS:
+            raise ValueError(f"latency_dist must be one of {LATENCY_DISTRIBUTIONS}")
+        self.config = config
+        self._random = random.Random(config.seed)
+        self._lock = threading.Lock()
+        self.counts = dict.fromkeys(OUTCOMES, 0)
+
+    def draw(self) -> Tuple[str, float]:
+        """(outcome, seconds to wait before answering) for one request."""
+        config = self.config
+        with self._lock:
+            roll = self._random.random()
+            if config.latency_dist == 'fixed':
+                latency = config.latency_ms
+            elif config.latency_dist == 'uniform':
+                latency = self._random.uniform(config.latency_ms - config.latency_spread, config.latency_ms + config.latency_spread)
+            elif config.latency_dist == 'exponential':
+                latency = self._random.expovariate(1 / config.latency_ms) if config.latency_ms > 0 else 0.0
+            else:
+                latency = self._random.lognormvariate(0, config.latency_spread) * config.latency_ms
+        outcome = 'ok'
+        for name, rate in (('timeout', config.timeout_rate), ('rate_limited', config.rate_limit_rate),
+                           ('server_error', config.error_rate), ('malformed', config.malformed_rate)):
+            if roll < rate:
+                outcome = name
+                break
+            roll -= rate
+        with self._lock:
+            self.counts[outcome] += 1
+        return outcome, config.hang_seconds if outcome == 'timeout' else max(0.0, latency) / 1000
+
+    def stats(self) -> Dict[str, Any]:
+        with self._lock:
+            return dict(self.counts, requests=sum(self.counts.values()))
+
+    def answer(self, request: Dict[str, Any]) -> Dict[str, Any]:
+        """A generateContent response whose text fits the request's responseSchema. Same prompt, same answer."""
+        parts = request.get('contents', [{}])[0].get('parts', [{}])
+        prompt = parts[0].get('text', '') if parts else ''
+        schema = request.get('generationConfig', {}).get('responseSchema') or {'type': 'STRING'}
+        value = fake_value(schema, 'response', prompt, prompt)
+        return {'candidates': [{'content': {'parts': [{'text': json.dumps(value)}], 'role': 'model'}, 'finishReason': 'STOP'}]}
+
+
+def _seed(*parts: str) -> int:
+    return int.from_bytes(hashlib.sha256('\x00'.join(parts).encode('utf-8')).digest()[:8], 'big')
+
+
+def fake_value(schema: Dict[str, Any], name: str, prompt: str, key: str) -> Any:
+    """
+    A value fitting `schema` for the field `name`, derived from `key` (the prompt, or the prompt and a batch userId).
+    Scores are integers from 40 to 100 and batch arrays get one entry per "(userId: ...)" candidate in the prompt.
+    """
+    kind = schema.get('type', 'STRING').upper()
+    if kind == 'OBJECT':
+        return {prop: fake_value(sub, prop, prompt, key) for prop, sub in schema.get('properties', {}).items()}
+    if kind == 'ARRAY':
+        items = schema.get('items', {'type': 'STRING'})
+        user_ids = BATCH_USER_ID.findall(prompt) if 'userId' in items.get('properties', {}) else []
+        if user_ids:
+            return [dict(fake_value(items, name, prompt, f"{key}\x00{user_id}"), userId=user_id) for user_id in user_ids]
+        return [fake_value(items, name, prompt, f"{key}\x00{n}") for n in range(1 + _seed(key, name) % 3)]
+    if kind == 'INTEGER':
+        return 40 + _seed(key, name) % 61
+    if kind == 'NUMBER':
+        return round((_seed(key, name) % 10000) / 100, 2)
+    if kind == 'BOOLEAN':
+        return bool(_seed(key, name) % 2)
+    if schema.get('enum'):
+        return schema['enum'][_seed(key, name) % len(schema['enum'])]
+    if name == 'confidenceLevel':
+        return CONFIDENCE_LEVELS[_seed(key, name) % len(CONFIDENCE_LEVELS)]
+    if name == 'recommendedDormArea':
+        return 'Central'
+    return f"Stand-in {name} ({_seed(key, name) % 10000:04d})."
+
+
+class FakeGeminiHandler(BaseHTTPRequestHandler):
+    """generateContent on POST (any model path), served counts on GET /stats."""
+    protocol_version = "HTTP/1.1"
+    fake: FakeGemini = None  # Set per server by start_fake_gemini
+
+    def send_json(self, status: int, body: Any, headers: Optional[Dict[str, str]] = None) -> None:
+        data = (body if isinstance(body, str) else json.dumps(body)).encode('utf-8')
+        self.send_response(status)
+        self.send_header('Content-Type', 'application/json')
+        self.send_header('Content-Length', str(len(data)))
+        for header, value in (headers or {}).items():
+            self.send_header(header, value)
+        self.end_headers()
+        self.wfile.write(data)
+
+    def do_GET(self):
+        if self.path.rstrip('/') == '/stats':
+            self.send_json(200, self.fake.stats())
+        else:
+            self.send_json(404, {'error': {'code': 404, 'message': 'Not found', 'status': 'NOT_FOUND'}})
+
+    def do_POST(self):
+        body = self.rfile.read(int(self.headers.get('Content-Length', 0)))
+        outcome, delay = self.fake.draw()
+        time.sleep(delay)
+        try:
+            if outcome == 'rate_limited':
+                self.send_json(429, {'error': {'code': 429, 'message': 'Resource has been exhausted (stand-in).', 'status': 'RESOURCE_EXHAUSTED'}},
+                               {'Retry-After': '1'})
+            elif outcome == 'server_error':
+                self.send_json(500, {'error': {'code': 500, 'message': 'Internal error (stand-in).', 'status': 'INTERNAL'}})
+            elif outcome == 'malformed':
+                answer = self.fake.answer(json.loads(body or b'{}'))
+                part = answer['candidates'][0]['content']['parts'][0]
+                part['text'] = part['text'][:len(part['text']) // 2]  # A cut-off generation: valid envelope, broken JSON text
+                self.send_json(200, answer)
+            else:
+                self.send_json(200, self.fake.answer(json.loads(body or b'{}')))
+        except (BrokenPipeError, ConnectionResetError):
+            pass  # The client gave up first (its read timeout fired), as it does against the real API
+
+    def log_message(self, *args):
+        pass
+
+
+def start_fake_gemini(config: FakeGeminiConfig = FakeGeminiConfig(), host: str = '127.0.0.1', port: int = 0) -> Tuple[ThreadingHTTPServer, str]:
+    """Serves a stand-in on a background thread. Returns (server, generateContent URL); call server.shutdown() when done."""
+    handler = type('ConfiguredFakeGeminiHandler', (FakeGeminiHandler,), {'fake': FakeGemini(config)})
+    server = ThreadingHTTPServer((host, port), handler)
+    server.daemon_threads = True
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    return server, f"http://{host}:{server.server_address[1]}/v1beta/models/gemini-2.5-pro:generateContent"
+
+
+if __name__ == "__main__":
+    defaults = FakeGeminiConfig()
+    parser = argparse.ArgumentParser(description="Local stand-in for the Gemini generateContent API")
+    parser.add_argument('--host', default='127.0.0.1')
+    parser.add_argument('--port', type=int, default=8001)
+    parser.add_argument('--latency-ms', type=float, default=defaults.latency_ms, help="Fixed value, mean or median (lognormal) latency")
+    parser.add_argument('--latency-dist', choices=LATENCY_DISTRIBUTIONS, default=defaults.latency_dist)
+    parser.add_argument('--latency-spread', type=float, default=defaults.latency_spread, help="+/- ms for uniform, sigma for lognormal")
+    parser.add_argument('--timeout-rate', type=float, default=0.0, help="Share of requests that hang for --hang-seconds")
+    parser.add_argument('--hang-seconds', type=float, default=defaults.hang_seconds)
+    parser.add_argument('--rate-limit-rate', type=float, default=0.0, help="Share of requests answered 429")
+    parser.add_argument('--error-rate', type=float, default=0.0, help="Share of requests answered 500")
+    parser.add_argument('--malformed-rate', type=float, default=0.0, help="Share of requests answered with broken JSON")
+    parser.add_argument('--seed', type=int, default=None)
+    args = parser.parse_args()
+
+    config = FakeGeminiConfig(args.latency_ms, args.latency_dist, args.latency_spread, args.timeout_rate, args.rate_limit_rate,
+                              args.error_rate, args.malformed_rate, args.hang_seconds, args.seed)
+    server, url = start_fake_gemini(config, args.host, args.port)
+    print("\n" + "="*60)
+    print("GEMINI STAND-IN")
+    print("="*60)
+    print(f"   Listening on:  {url}")
+    print(f"   Latency:       {config.latency_dist}, {config.latency_ms:g} ms (spread {config.latency_spread:g})")
+    print(f"   Failure rates: timeout {config.timeout_rate:g}, 429 {config.rate_limit_rate:g}, 500 {config.error_rate:g}, malformed {config.malformed_rate:g}")
+    print(f"   Backend:       GEMINI_API_URL={url}")
+    print(f"   Counts:        GET http://{args.host}:{args.port}/stats")
+    print("="*60 + "\n")
+    try:
+        threading.Event().wait()
+    except KeyboardInterrupt:
+        server.shutdown()
+        sys.exit(0)
@@ -1,7 +1,15 @@
-from fastapi import FastAPI, HTTPException
+from fastapi import FastAPI, HTTPException, Request
+from fastapi.responses import PlainTextResponse, StreamingResponse
 from fastapi.middleware.cors import CORSMiddleware
 from pydantic import BaseModel
 from typing import Dict, Any, Optional, List
+from contextlib import asynccontextmanager
+from concurrent.futures import ThreadPoolExecutor
+import asyncio
+import contextvars
+import json
+import logging
+import threading
 import sys
 import os
 
@@ -21,7 +29,36 @@ hackumass_backend = importlib.util.module_from_spec(spec)
 spec.loader.exec_module(hackumass_backend)
 score_and_rank_matches = hackumass_backend.score_and_rank_matches
 
-app = FastAPI(title="UMass Housing Recommender API")
+# Pipeline logs go through a queue to a background writer; LOG_LEVEL and LOG_FORMAT pick what is written and how
+hackumass_backend.configure_logging()
+logger = logging.getLogger("umatch.api")
+
+# The matching pipeline is synchronous (blocking Gemini calls), so it runs on its own thread pool
+# instead of the event loop. MATCH_WORKERS is how many users can be matched at the same time.
+MATCH_WORKERS = int(os.getenv("MATCH_WORKERS", "8"))
+matching_executor = ThreadPoolExecutor(max_workers=MATCH_WORKERS, thread_name_prefix="matching")
+STREAM_DISCONNECT_POLL = 0.5  # Seconds between client disconnect checks while a stream waits for the pipeline
+
+
+class StreamClosed(Exception):
+    """Raised from a stream's on_event once the client is gone, so the pipeline stops at its next progress report."""
+
+
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    # Load the candidate store (and the workbook cache) before the first request instead of during it
+    hackumass_backend.get_candidate_store()
+    yield
+    matching_executor.shutdown(wait=False, cancel_futures=True)
+    hackumass_backend.stop_logging()
+
+
+def run_matching(fn, *args):
+    """Runs fn on the matching pool in a copy of the current context, so backend logs keep the request ID."""
+    return asyncio.get_running_loop().run_in_executor(matching_executor, contextvars.copy_context().run, fn, *args)
+
+
+app = FastAPI(title="UMass Housing Recommender API", lifespan=lifespan)
 
 # Configure CORS to allow Next.js frontend
 app.add_middleware(
@@ -40,6 +77,14 @@ app.add_middleware(
     allow_headers=["*"],
 )
 
+@app.middleware("http")
+async def assign_request_id(request, call_next):
+    """Tags every log line of a request with its X-Request-ID header (or a new ID), echoed in the response."""
+    request_id = hackumass_backend.set_request_id(request.headers.get("X-Request-ID"))
+    response = await call_next(request)
+    response.headers["X-Request-ID"] = request_id
+    return response
+
 # Request/Response models
 class UserProfile(BaseModel):
     userId: Optional[str] = None
@@ -94,6 +139,10 @@ class MatchResponse(BaseModel):
     ranked_matches: List[Dict[str, Any]]
     message: Optional[str] = None
     error: Optional[str] = None
+    degraded_candidates: List[Dict[str, Any]] = []  # Top candidates scored by fallback: {"userId", "candidateName", "reason"}
+
+class CohortMatchRequest(BaseModel):
+    profiles: List[UserProfile]
 
 @app.get("/")
 def root():
@@ -103,156 +152,294 @@ def root():
 def health_check():
     return {"status": "healthy"}
 
+@app.get("/api/stats")
+def get_stats():
+    """Connection reuse for Gemini calls, circuit breaker state, score cache hit rates and prompt size savings."""
+    return {
+        "http": hackumass_backend.get_http_stats(),
+        "circuitBreaker": hackumass_backend.get_circuit_breaker().stats(),
+        "scoreCache": hackumass_backend.get_score_cache().stats(),
+        "prompts": hackumass_backend.get_prompt_stats().stats(),
+        "pipeline": hackumass_backend.get_pipeline_metrics().stats(),
+    }
+
+@app.get("/metrics", response_class=PlainTextResponse)
+def get_metrics():
+    """Per-stage latency histograms, API, fallback and cache counters and circuit breaker state in the Prometheus text format."""
+    return PlainTextResponse(hackumass_backend.get_pipeline_metrics().render_prometheus(),
+                             media_type="text/plain; version=0.0.4")
+
+def normalize_profile(profile: UserProfile) -> Dict[str, Any]:
+    """Maps the quiz's frontend field names onto the profile fields the matching backend expects."""
+    with hackumass_backend.get_pipeline_metrics().time_stage("normalization"):
+        return _normalize_profile(profile)
+
+
+def _normalize_profile(profile: UserProfile) -> Dict[str, Any]:
+    # Convert Pydantic model to dict and normalize field names
+    profile_dict = profile.dict(exclude_none=True)
+    
+    # Normalize field names to match Python backend expectations
+    normalized_profile = {}
+    for key, value in profile_dict.items():
+        # Map frontend field names to backend field names
+        if key == "yearStatus":
+            # Map yearStatus to studentYear (new backend field name)
+            normalized_profile["yearStatus"] = value
+            if value == "first-year":
+                normalized_profile["studentYear"] = "first-years"
+                normalized_profile["yearPref"] = "first-years"  # Keep for compatibility
+            elif value == "upperclassman":
+                normalized_profile["studentYear"] = "upperclassmen"
+                normalized_profile["yearPref"] = "upperclassmen"  # Keep for compatibility
+            else:
+                normalized_profile["studentYear"] = value
+                normalized_profile["yearPref"] = value
+        elif key == "socialLevelType":
+            normalized_profile["socialLevel"] = value
+        elif key == "noiseLevelType":
+            normalized_profile["noiseLevel"] = value
+        elif key == "yearMix":
+            normalized_profile["yearPref"] = value
+        elif key == "tidinessLevel":
+            normalized_profile["tidiness"] = value
+        elif key == "guestFrequencyType":
+            normalized_profile["guestFrequency"] = value
+        elif key == "kitchenImportanceType":
+            normalized_profile["kitchenImportance"] = value
+        elif key == "commuteDistanceType":
+            normalized_profile["commuteDistance"] = value
+        elif key == "outdoorSpaceType":
+            normalized_profile["outdoorSpace"] = value
+        elif key == "sharedInterestsType":
+            normalized_profile["sharedInterests"] = value
+        elif key == "sensitivitiesType":
+            normalized_profile["sensitivities"] = value
+        elif key == "priorities":
+            # Handle priorities object - also extract individual fields for compatibility
+            if isinstance(value, dict):
+                normalized_profile["priorities"] = value
+                # Also set individual priority fields for backward compatibility
+                normalized_profile["priorityLocation"] = str(value.get("location", "4"))
+                normalized_profile["priorityPrivacy"] = str(value.get("privacy", "4"))
+                normalized_profile["priorityAmenities"] = str(value.get("amenities", "4"))
+                normalized_profile["prioritySocial"] = str(value.get("social", "4"))
+            else:
+                normalized_profile["priorities"] = value
+        elif key in ["priorityLocation", "priorityPrivacy", "priorityAmenities", "prioritySocial"]:
+            # Pass through individual priority fields
+            normalized_profile[key] = str(value) if value else "4"
+        elif key == "genderType":
+            # Map user's gender to dorm preference
+            # Store user's actual gender for matching
+            normalized_profile["userGender"] = value
+            # Map to dorm preference: male/female can match same-gender or co-ed, non-binary/prefer-not-to-say prefer co-ed
+            if value in ["male", "female"]:
+                # Default to co-ed but can match same-gender dorms
+                normalized_profile["genderPref"] = "coed"
+            elif value in ["non-binary", "prefer-not-to-say"]:
+                normalized_profile["genderPref"] = "coed"
+            else:
+                normalized_profile["genderPref"] = "coed"  # Default fallback
+        elif key == "breakHousing":
+            # Map breakHousing to breakHousingPref (new backend field name)
+            normalized_profile["breakHousingPref"] = value
+        elif key == "major":
+            # Pass through major for dorm recommendation (used for academic zone mapping)
+            normalized_profile["major"] = value
+            # Also set college field if not already set (backend will map from major)
+            if "college" not in normalized_profile:
+                normalized_profile["college"] = "General/Other"  # Backend will map from major
+        elif key == "isHonors":
+            # Pass through isHonors for dorm recommendation
+            normalized_profile["isHonors"] = value
+        elif key == "accessible":
+            # Handle accessible field - convert string/boolean to expected format
+            if isinstance(value, bool):
+                normalized_profile["accessible"] = "yes" if value else "no"
+            elif isinstance(value, str):
+                if value.lower() in ["yes", "true", "1", "required"]:
+                    normalized_profile["accessible"] = "yes"
+                elif value.lower() in ["preferred"]:
+                    normalized_profile["accessible"] = "preferred"
+                else:
+                    normalized_profile["accessible"] = "no"
+            else:
+                normalized_profile["accessible"] = "no"
+        elif key in ["budgetRange", "budget", "housingType", "locationType", "laundry", "bathroom", 
+                     "climateControl", "medicalRequirements", "dietaryReligious", "themeDorm", "priorityPrice"]:
+            # Skip removed or unused fields
+            continue
+        else:
+            normalized_profile[key] = value
+    
+    # Ensure required fields have defaults
+    if "userId" not in normalized_profile or not normalized_profile["userId"]:
+        normalized_profile["userId"] = f"user_{abs(hash(str(normalized_profile))) % 10000}"
+    
+    if "name" not in normalized_profile or not normalized_profile["name"]:
+        normalized_profile["name"] = "Current User"
+    
+    if "major" not in normalized_profile or not normalized_profile["major"]:
+        normalized_profile["major"] = "General"
+    
+    return normalized_profile
+
+
+def coerce_match_result(result: Any) -> Dict[str, Any]:
+    """Checks a score_and_rank_matches result and fills in the fields MatchResponse requires."""
+    # Ensure result has required fields
+    if not isinstance(result, dict):
+        raise ValueError("Backend returned invalid result format")
+    
+    # Ensure ranked_matches is a list
+    if 'ranked_matches' not in result:
+        result['ranked_matches'] = []
+    elif not isinstance(result['ranked_matches'], list):
+        result['ranked_matches'] = []
+    
+    # Ensure dorm_recommendation exists
+    if 'dorm_recommendation' not in result:
+        result['dorm_recommendation'] = 'Unknown'
+    
+    return result
+
+
 @app.post("/api/match", response_model=MatchResponse)
 async def get_matches(profile: UserProfile):
     """
     Main endpoint to get dorm recommendations and roommate matches.
     Takes a user profile and returns ranked matches.
     """
+    # The REQUEST_DEADLINE budget starts now, so normalization and waiting for a matching thread count against it
+    hackumass_backend.set_deadline()
     try:
-        # Convert Pydantic model to dict and normalize field names
-        profile_dict = profile.dict(exclude_none=True)
+        normalized_profile = normalize_profile(profile)
         
-        # Normalize field names to match Python backend expectations
-        normalized_profile = {}
-        for key, value in profile_dict.items():
-            # Map frontend field names to backend field names
-            if key == "yearStatus":
-                # Map yearStatus to studentYear (new backend field name)
-                normalized_profile["yearStatus"] = value
-                if value == "first-year":
-                    normalized_profile["studentYear"] = "first-years"
-                    normalized_profile["yearPref"] = "first-years"  # Keep for compatibility
-                elif value == "upperclassman":
-                    normalized_profile["studentYear"] = "upperclassmen"
-                    normalized_profile["yearPref"] = "upperclassmen"  # Keep for compatibility
-                else:
-                    normalized_profile["studentYear"] = value
-                    normalized_profile["yearPref"] = value
-            elif key == "socialLevelType":
-                normalized_profile["socialLevel"] = value
-            elif key == "noiseLevelType":
-                normalized_profile["noiseLevel"] = value
-            elif key == "yearMix":
-                normalized_profile["yearPref"] = value
-            elif key == "tidinessLevel":
-                normalized_profile["tidiness"] = value
-            elif key == "guestFrequencyType":
-                normalized_profile["guestFrequency"] = value
-            elif key == "kitchenImportanceType":
-                normalized_profile["kitchenImportance"] = value
-            elif key == "commuteDistanceType":
-                normalized_profile["commuteDistance"] = value
-            elif key == "outdoorSpaceType":
-                normalized_profile["outdoorSpace"] = value
-            elif key == "sharedInterestsType":
-                normalized_profile["sharedInterests"] = value
-            elif key == "sensitivitiesType":
-                normalized_profile["sensitivities"] = value
-            elif key == "priorities":
-                # Handle priorities object - also extract individual fields for compatibility
-                if isinstance(value, dict):
-                    normalized_profile["priorities"] = value
-                    # Also set individual priority fields for backward compatibility
-                    normalized_profile["priorityLocation"] = str(value.get("location", "4"))
-                    normalized_profile["priorityPrivacy"] = str(value.get("privacy", "4"))
-                    normalized_profile["priorityAmenities"] = str(value.get("amenities", "4"))
-                    normalized_profile["prioritySocial"] = str(value.get("social", "4"))
-                else:
-                    normalized_profile["priorities"] = value
-            elif key in ["priorityLocation", "priorityPrivacy", "priorityAmenities", "prioritySocial"]:
-                # Pass through individual priority fields
-                normalized_profile[key] = str(value) if value else "4"
-            elif key == "genderType":
-                # Map user's gender to dorm preference
-                # Store user's actual gender for matching
-                normalized_profile["userGender"] = value
-                # Map to dorm preference: male/female can match same-gender or co-ed, non-binary/prefer-not-to-say prefer co-ed
-                if value in ["male", "female"]:
-                    # Default to co-ed but can match same-gender dorms
-                    normalized_profile["genderPref"] = "coed"
-                elif value in ["non-binary", "prefer-not-to-say"]:
-                    normalized_profile["genderPref"] = "coed"
-                else:
-                    normalized_profile["genderPref"] = "coed"  # Default fallback
-            elif key == "breakHousing":
-                # Map breakHousing to breakHousingPref (new backend field name)
-                normalized_profile["breakHousingPref"] = value
-            elif key == "major":
-                # Pass through major for dorm recommendation (used for academic zone mapping)
-                normalized_profile["major"] = value
-                # Also set college field if not already set (backend will map from major)
-                if "college" not in normalized_profile:
-                    normalized_profile["college"] = "General/Other"  # Backend will map from major
-            elif key == "isHonors":
-                # Pass through isHonors for dorm recommendation
-                normalized_profile["isHonors"] = value
-            elif key == "accessible":
-                # Handle accessible field - convert string/boolean to expected format
-                if isinstance(value, bool):
-                    normalized_profile["accessible"] = "yes" if value else "no"
-                elif isinstance(value, str):
-                    if value.lower() in ["yes", "true", "1", "required"]:
-                        normalized_profile["accessible"] = "yes"
-                    elif value.lower() in ["preferred"]:
-                        normalized_profile["accessible"] = "preferred"
-                    else:
-                        normalized_profile["accessible"] = "no"
-                else:
-                    normalized_profile["accessible"] = "no"
-            elif key in ["budgetRange", "budget", "housingType", "locationType", "laundry", "bathroom", 
-                         "climateControl", "medicalRequirements", "dietaryReligious", "themeDorm", "priorityPrice"]:
-                # Skip removed or unused fields
-                continue
-            else:
-                normalized_profile[key] = value
-        
-        # Ensure required fields have defaults
-        if "userId" not in normalized_profile or not normalized_profile["userId"]:
-            normalized_profile["userId"] = f"user_{abs(hash(str(normalized_profile))) % 10000}"
-        
-        if "name" not in normalized_profile or not normalized_profile["name"]:
-            normalized_profile["name"] = "Current User"
-        
-        if "major" not in normalized_profile or not normalized_profile["major"]:
-            normalized_profile["major"] = "General"
-        
-        # Call the Python backend function
+        # Call the Python backend function (off the event loop, so other requests keep being served)
         try:
-            result = score_and_rank_matches(
+            result = await run_matching(
+                score_and_rank_matches,
                 normalized_profile,
                 normalized_profile.get("userId", f"user_{abs(hash(str(normalized_profile))) % 10000}")
             )
             
-            # Ensure result has required fields
-            if not isinstance(result, dict):
-                raise ValueError("Backend returned invalid result format")
-            
-            # Ensure ranked_matches is a list
-            if 'ranked_matches' not in result:
-                result['ranked_matches'] = []
-            elif not isinstance(result['ranked_matches'], list):
-                result['ranked_matches'] = []
-            
-            # Ensure dorm_recommendation exists
-            if 'dorm_recommendation' not in result:
-                result['dorm_recommendation'] = 'Unknown'
-            
-            return MatchResponse(**result)
+            return MatchResponse(**coerce_match_result(result))
         except Exception as backend_error:
-            print(f"Backend error in score_and_rank_matches: {str(backend_error)}")
-            import traceback
-            traceback.print_exc()
+            logger.exception("Backend error in score_and_rank_matches: %s", backend_error)
             raise HTTPException(status_code=500, detail=f"Backend processing error: {str(backend_error)}")
         
     except HTTPException:
         raise
     except Exception as e:
-        print(f"Error in /api/match: {str(e)}")
-        import traceback
-        traceback.print_exc()
+        logger.exception("Error in /api/match: %s", e)
         raise HTTPException(status_code=500, detail=f"Internal server error: {str(e)}")
 
+@app.post("/api/match/stream")
+async def stream_matches(profile: UserProfile, request: Request):
+    """
+    Same matching as /api/match, streamed as NDJSON so results show up before the API calls finish:
+    a "preliminary" MatchResponse ranked by fallback scores, a "refinement" line per API-scored candidate,
+    then the "final" MatchResponse (or an "error" line). The preliminary line is skipped when nothing needs the API.
+    If the client disconnects, the pipeline stops at its next progress report and unsent API calls are dropped.
+    """
+    hackumass_backend.set_deadline()
+    normalized_profile = normalize_profile(profile)
+    user_id = normalized_profile.get("userId", f"user_{abs(hash(str(normalized_profile))) % 10000}")
+
+    async def stream_events():
+        loop = asyncio.get_running_loop()
+        events: asyncio.Queue = asyncio.Queue()
+        closed = threading.Event()
+
+        def on_event(kind, payload):
+            if closed.is_set():
+                raise StreamClosed()
+            loop.call_soon_threadsafe(events.put_nowait, (kind, payload))
+
+        def run_pipeline():
+            try:
+                result = score_and_rank_matches(normalized_profile, user_id, None, on_event)
+                on_event("final", result)
+            except StreamClosed:
+                logger.info("Client disconnected, matching for %s stopped", user_id)
+            except Exception as e:
+                logger.exception("Backend error in score_and_rank_matches: %s", e)
+                on_event("error", {"error": str(e)})
+
+        run_matching(run_pipeline)
+        try:
+            while True:
+                try:
+                    kind, payload = await asyncio.wait_for(events.get(), STREAM_DISCONNECT_POLL)
+                except asyncio.TimeoutError:
+                    if await request.is_disconnected():
+                        break
+                    continue
+                if kind in ("preliminary", "final"):
+                    try:
+                        payload = MatchResponse(**coerce_match_result(payload)).dict()
+                    except Exception as e:
+                        kind, payload = "error", {"error": str(e)}
+                yield json.dumps(dict(payload, type=kind), default=str) + "\n"
+                if kind in ("final", "error") or await request.is_disconnected():
+                    break
+        finally:
+            # Also reached when the server cancels the stream because the client went away
+            closed.set()
+
+    return StreamingResponse(stream_events(), media_type="application/x-ndjson")
+
+@app.post("/api/match/batch")
+async def get_cohort_matches(request: CohortMatchRequest):
+    """
+    Matches a whole cohort in one request. Streams NDJSON: one MatchResponse line per user, tagged with
+    its position in the request and userId, in the order users finish.
+    """
+    try:
+        profiles = [normalize_profile(profile) for profile in request.profiles]
+    except Exception as e:
+        raise HTTPException(status_code=400, detail=f"Invalid profile: {str(e)}")
+
+    async def stream_results():
+        loop = asyncio.get_running_loop()
+        items: asyncio.Queue = asyncio.Queue()
+        stop = threading.Event()
+        finished = object()
+
+        def drain():
+            # One worker runs the cohort generator from start to close, so it is never advanced and closed at once
+            # `stop` also keeps queued users from starting while the worker still waits for a running one
+            results = hackumass_backend.score_and_rank_cohort(profiles, cancel=stop)
+            try:
+                for item in results:
+                    loop.call_soon_threadsafe(items.put_nowait, item)
+                    if stop.is_set():
+                        break
+            except Exception as e:
+                logger.exception("Cohort matching failed: %s", e)
+            finally:
+                results.close()  # Cancels the users that have not started if the client left
+                loop.call_soon_threadsafe(items.put_nowait, finished)
+
+        run_matching(drain)
+        try:
+            while True:
+                item = await items.get()
+                if item is finished:
+                    break
+                index, result = item
+                try:
+                    response = MatchResponse(**coerce_match_result(result))
+                except Exception as e:
+                    response = MatchResponse(dorm_recommendation='Unknown', ranked_matches=[], error=str(e))
+                line = dict(response.dict(), index=index, userId=profiles[index]["userId"])
+                yield json.dumps(line, default=str) + "\n"
+        finally:
+            stop.set()
+
+    return StreamingResponse(stream_results(), media_type="application/x-ndjson")
+
 if __name__ == "__main__":
     import uvicorn
     port = int(os.getenv("PORT", 8000))
@@ -0,0 +1,367 @@
+#!/usr/bin/env python3
+"""
+Synthetic applicant pools for benchmarks and assignment runs
+Learns trait distributions from the known profiles (SIMULATED_PROFILES plus any applicants in Roommate_data.xlsx, with
+the workbook's college table as extra college → area/major observations) and samples millions of schema-valid
+profiles from them, streamed to disk in the columnar .npy format the roommate data cache uses
+"""
+
+import sys
+import os
+import re
+import json
+import time
+import shutil
+import argparse
+from typing import Any, Dict, Iterator, List, NamedTuple, Optional, Tuple
+sys.path.insert(0, os.path.dirname(__file__))
+
+import numpy as np
+
+from HackUmass_back_end import (
+    FALLBACK_TRAIT_VALUES,
+    PROFILE_FIELDS,
+    PROFILE_UNIQUE_FIELDS,
+    QUAD_ROOM_AREAS,
+    RESIDENTIAL_AREA_TO_HALLS,
+    RESTRICTED_UPPERCLASS_AREAS,
+    ROOM_TYPES,
+    ROOMMATE_DATA_CACHE_VERSION,
+    SIMULATED_PROFILES,
+    TRIPLE_ROOM_AREAS,
+    ColumnTable,
+    RoommateData,
+    load_roommate_data,
+    normalize_dorm_area,
+    normalize_student_year,
+    ROOMMATE_DATA_PATH,
+)
+
+# Each field is drawn given the fields it depends on most (drawn before it); the rest are drawn from their marginals.
+# Parents must come earlier in the generation order.
+FIELD_PARENTS = {
+    'major': ('college',),
+    'dormArea': ('college', 'studentYear'),
+    'roomType': ('dormArea',),
+    'noiseLevel': ('sleepSchedule',),
+    'tidiness': ('sleepSchedule',),
+    'socialLevel': ('noiseLevel',),
+    'guestFrequency': ('socialLevel',),
+    'environmentPref': ('noiseLevel',),
+    'activityProximity': ('environmentPref',),
+    'communityType': ('environmentPref',),
+    'genderInclusivePref': ('genderPref',),
+    'commuteDistance': ('campusProximity',),
+}
+
+# Fields drawn together as one combination some known profile gave, so the four priority ranks stay consistent
+FIELD_BLOCKS = [('priorityLocation', 'priorityPrivacy', 'priorityAmenities', 'prioritySocial')]
+
+# Fields copied from another field instead of drawn (the store matches on either year field)
+DERIVED_FIELDS = {'yearPref': 'studentYear'}
+
+# Answers the schema accepts even if no known profile gave them yet
+FIELD_VOCABULARIES = dict(FALLBACK_TRAIT_VALUES, dormArea=list(RESIDENTIAL_AREA_TO_HALLS), roomType=list(ROOM_TYPES),
+                          studentYear=['first-years', 'upperclassmen'])
+
+SMOOTHING = 0.5  # Pseudo-count per vocabulary answer, so unseen answers stay possible
+PARENT_PRIOR = 2.0  # Weight of the marginal in each conditional distribution; sparse parent values lean on it
+CHUNK_ROWS = 65536  # Rows sampled per step; each chunk is seeded by its number, so changing this changes the output
+
+
+class ApplicantModel(NamedTuple):
+    """Learned distributions. `tables` maps a drawn field to (parents, cumulative probabilities per parent code)."""
+    fields: List[str]  # Generation order
+    vocabularies: Dict[str, List[str]]
+    tables: Dict[str, Tuple[Tuple[str, ...], np.ndarray]]
+    blocks: List[Tuple[Tuple[str, ...], np.ndarray, np.ndarray]]  # (fields, observed code rows, cumulative weights)
+    observations: int
+
+
+def _college_name(value: str) -> str:
+    """College table names carry an abbreviation ('College of Natural Sciences (CNS)'); profiles do not."""
+    return re.sub(r'\s*\(.*\)\s*$', '', value).strip()
+
+
+def reference_observations(tables: Dict[str, ColumnTable]) -> List[Dict[str, str]]:
+    """
+    Partial profiles from the workbook's college table: one (college, dormArea) observation per college and one
+    (college, major) observation per listed major example.
+    """
+    observations = []
+    for table in tables.values():
+        if not {'college', 'primary_proximate_residential_area'} <= set(table.columns):
+            continue
+        for row in table.rows():
+            college = _college_name(row.get('college', ''))
+            area = normalize_dorm_area(row.get('primary_proximate_residential_area'))
+            if not college:
+                continue
+            if area:
+                observations.append({'college': college, 'dormArea': area})
+            for major in row.get('major_examples', '').split(','):
+                if major.strip():
+                    observations.append({'college': college, 'major': major.strip()})
+    return observations
+
+
+def _valid_answer(field: str, value: Any) -> bool:
+    if field == 'roomType':
+        return value in ROOM_TYPES
+    if field == 'dormArea':
+        return value in RESIDENTIAL_AREA_TO_HALLS
+    if field == 'studentYear':
+        return value in FIELD_VOCABULARIES['studentYear']
+    return value not in (None, '')
+
+
+def _allowed(field: str, parents: Tuple[str, ...], parent_values: Tuple[str, ...], value: str) -> bool:
+    """Combinations the store would reject or never return: first-years in North/Sylvan, triples/quads elsewhere."""
+    context = dict(zip(parents, parent_values))
+    if field == 'dormArea' and context.get('studentYear') == 'first-years':
+        return value.lower() not in RESTRICTED_UPPERCLASS_AREAS
+    if field == 'roomType' and 'dormArea' in context:
+        return ((value != 'triple' or context['dormArea'] in TRIPLE_ROOM_AREAS)
+                and (value != 'quad' or context['dormArea'] in QUAD_ROOM_AREAS))
+    return True
+
+
+def _cumulative(weights: np.ndarray) -> np.ndarray:
+    cumulative = np.cumsum(weights / weights.sum(axis=-1, keepdims=True), axis=-1)
+    cumulative[..., -1] = 1.0
+    return cumulative
+
+
+def learn_applicant_model(profiles: List[Dict[str, Any]], observations: List[Dict[str, str]] = ()) -> ApplicantModel:
+    """
+    Fits the generator to known profiles. Marginals are answer counts plus SMOOTHING; a field with parents gets one
+    distribution per parent combination, its counts blended with the marginal (PARENT_PRIOR), then masked by _allowed.
+    `observations` are partial profiles that only count toward the fields they have.
+    """
+    rows = []
+    for profile in profiles:
+        row = {field: str(value) for field, value in profile.items() if field in PROFILE_FIELDS and value not in (None, '')}
+        if 'studentYear' in row:
+            row['studentYear'] = normalize_student_year(row['studentYear'], default=None)
+        rows.append(row)
+    rows += [dict(observation) for observation in observations]
+
+    block_fields = {field for block in FIELD_BLOCKS for field in block}
+    present = {field for row in rows for field in row}
+    drawn = [field for field in PROFILE_FIELDS
+             if field in present and field not in PROFILE_UNIQUE_FIELDS and field not in DERIVED_FIELDS and field not in block_fields]
+    # Parents first; otherwise keep PROFILE_FIELDS order
+    fields: List[str] = []
+    def place(field: str) -> None:
+        if field not in fields:
+            for parent in FIELD_PARENTS.get(field, ()):
+                if parent in drawn:
+                    place(parent)
+            fields.append(field)
+    for field in drawn:
+        place(field)
+
+    vocabularies = {}
+    for field in fields:
+        seen = [row[field] for row in rows if _valid_answer(field, row.get(field))]
+        vocabularies[field] = list(dict.fromkeys(FIELD_VOCABULARIES.get(field, []) + sorted(set(seen))))
+
+    tables = {}
+    for field in fields:
+        vocabulary = vocabularies[field]
+        index = {value: code for code, value in enumerate(vocabulary)}
+        parents = tuple(parent for parent in FIELD_PARENTS.get(field, ()) if parent in fields)
+        shape = tuple(len(vocabularies[parent]) for parent in parents)
+        counts = np.zeros(shape + (len(vocabulary),))
+        marginal = np.full(len(vocabulary), SMOOTHING)
+        for row in rows:
+            if row.get(field) not in index:
+                continue
+            marginal[index[row[field]]] += 1
+            parent_codes = [vocabularies[parent].index(row[parent]) if row.get(parent) in vocabularies[parent] else None
+                            for parent in parents]
+            if None not in parent_codes:
+                counts[tuple(parent_codes) + (index[row[field]],)] += 1
+        marginal /= marginal.sum()
+        weights = counts + PARENT_PRIOR * marginal
+        for parent_codes in np.ndindex(*shape):
+            parent_values = tuple(vocabularies[parent][code] for parent, code in zip(parents, parent_codes))
+            for code, value in enumerate(vocabulary):
+                if not _allowed(field, parents, parent_values, value):
+                    weights[parent_codes + (code,)] = 0.0
+        tables[field] = (parents, _cumulative(weights.reshape(-1, len(vocabulary))))
+
+    blocks = []
+    for block in FIELD_BLOCKS:
+        combos = [tuple(row[field] for field in block) for row in rows if all(row.get(field) for field in block)]
+        if not combos:
+            continue
+        for position, field in enumerate(block):
+            vocabularies[field] = sorted({combo[position] for combo in combos})
+        unique, counts = np.unique(np.array([[vocabularies[field].index(value) for field, value in zip(block, combo)]
+                                             for combo in combos], dtype=np.int32), axis=0, return_counts=True)
+        blocks.append((block, unique, _cumulative(counts.astype(float))))
+
+    return ApplicantModel(fields, vocabularies, tables, blocks, len(rows))
+
+
+def default_applicant_model(workbook: Optional[str] = ROOMMATE_DATA_PATH) -> ApplicantModel:
+    """The model learned from SIMULATED_PROFILES and, if it can be read, the applicant workbook."""
+    profiles, observations = list(SIMULATED_PROFILES), []
+    if workbook and os.path.exists(workbook):
+        data = load_roommate_data(workbook)
+        profiles += data.profiles.rows()
+        observations = reference_observations(data.tables)
+    return learn_applicant_model(profiles, observations)
+
+
+def _draw(cumulative: np.ndarray, rng: np.random.Generator) -> np.ndarray:
+    """One code per row of `cumulative` (inverse-CDF sampling)."""
+    draws = rng.random(len(cumulative))
+    return np.minimum((draws[:, None] >= cumulative).sum(axis=1), cumulative.shape[1] - 1).astype(np.int32)
+
+
+def sample_applicant_codes(model: ApplicantModel, count: int, seed: Tuple[int, ...]) -> Dict[str, np.ndarray]:
+    """
+    Vocabulary codes for `count` applicants, one int32 array per field. Each field draws from its own stream
+    (`seed` plus the field's position), so the first rows come out the same whatever `count` is.
+    """
+    codes: Dict[str, np.ndarray] = {}
+    for position, field in enumerate(model.fields):
+        parents, cumulative = model.tables[field]
+        parent_code = np.zeros(count, dtype=np.int64)
+        for parent in parents:
+            parent_code = parent_code * len(model.vocabularies[parent]) + codes[parent]
+        codes[field] = _draw(cumulative[parent_code], np.random.default_rng(seed + (position,)))
+    for position, (block, combos, cumulative) in enumerate(model.blocks, len(model.fields)):
+        rng = np.random.default_rng(seed + (position,))
+        chosen = combos[_draw(np.broadcast_to(cumulative, (count, len(cumulative))), rng)]
+        for position, field in enumerate(block):
+            codes[field] = chosen[:, position]
+    for field, source in DERIVED_FIELDS.items():
+        if source in codes:
+            codes[field] = codes[source]
+    return codes
+
+
+def _columns(model: ApplicantModel) -> List[str]:
+    fields = set(model.fields) | {field for block, _, _ in model.blocks for field in block}
+    fields |= {field for field, source in DERIVED_FIELDS.items() if source in fields}
+    return [field for field in PROFILE_FIELDS if field in fields or field in PROFILE_UNIQUE_FIELDS]
+
+
+def _vocabulary(model: ApplicantModel, field: str) -> List[str]:
+    return model.vocabularies[DERIVED_FIELDS.get(field, field)]
+
+
+def _unique_values(field: str, start: int, stop: int) -> List[str]:
+    template = "synthetic_{}" if field == 'userId' else "Applicant {}"
+    return [template.format(i) for i in range(start, stop)]
+
+
+def _chunks(model: ApplicantModel, count: int, seed: int) -> Iterator[Tuple[int, int, Dict[str, np.ndarray]]]:
+    for chunk, start in enumerate(range(0, count, CHUNK_ROWS)):
+        stop = min(count, start + CHUNK_ROWS)
+        yield start, stop, sample_applicant_codes(model, stop - start, (seed, chunk))
+
+
+def generate_applicants(count: int, seed: int = 0, model: Optional[ApplicantModel] = None) -> Iterator[Dict[str, Any]]:
+    """Yields `count` synthetic profiles. The same seed gives the same applicants, and a larger count only adds more."""
+    model = model or default_applicant_model()
+    columns = _columns(model)
+    for start, stop, codes in _chunks(model, count, seed):
+        decoded = [(field, _unique_values(field, start, stop)) if field in PROFILE_UNIQUE_FIELDS
+                   else (field, [_vocabulary(model, field)[code] for code in codes[field].tolist()]) for field in columns]
+        for position in range(stop - start):
+            yield {field: values[position] for field, values in decoded}
+
+
+def write_applicant_store(directory: str, count: int, seed: int = 0, model: Optional[ApplicantModel] = None) -> Dict[str, Any]:
+    """
+    Writes `count` synthetic profiles (the same ones generate_applicants yields) in the roommate data cache layout:
+    manifest.json plus profiles/<field>.codes.npy and .values.npy. Chunks go straight into memory-mapped files, so
+    memory use does not grow with `count`. Returns the manifest.
+    """
+    model = model or default_applicant_model()
+    columns = _columns(model)
+    staging_dir = f"{directory}.tmp-{os.getpid()}"
+    shutil.rmtree(staging_dir, ignore_errors=True)
+    profiles_dir = os.path.join(staging_dir, "profiles")
+    os.makedirs(profiles_dir)
+
+    started = time.perf_counter()
+    code_files = {}
+    for field in columns:
+        path = os.path.join(profiles_dir, f"{field}.codes.npy")
+        code_files[field] = np.lib.format.open_memmap(path, mode='w+', dtype=np.int32, shape=(count,))
+        if field in PROFILE_UNIQUE_FIELDS:
+            # Every row has its own value: codes are row numbers into a values column written alongside
+            width = max(1, len(_unique_values(field, max(count - 1, 0), max(count, 1))[0]))
+            values = np.lib.format.open_memmap(os.path.join(profiles_dir, f"{field}.values.npy"), mode='w+',
+                                               dtype=f"<U{width}", shape=(count,))
+            for start in range(0, count, CHUNK_ROWS):
+                stop = min(count, start + CHUNK_ROWS)
+                values[start:stop] = _unique_values(field, start, stop)
+                code_files[field][start:stop] = np.arange(start, stop, dtype=np.int32)
+            values.flush()
+            del values
+        else:
+            np.save(os.path.join(profiles_dir, f"{field}.values.npy"), np.array(_vocabulary(model, field), dtype=str))
+
+    for start, stop, codes in _chunks(model, count, seed):
+        for field in columns:
+            if field not in PROFILE_UNIQUE_FIELDS:
+                code_files[field][start:stop] = codes[field]
+    for array in code_files.values():
+        array.flush()
+    code_files.clear()
+
+    manifest = {
+        "version": ROOMMATE_DATA_CACHE_VERSION,
+        "source": {"generator": "synthetic_applicants", "count": count, "seed": seed,
+                   "modelObservations": model.observations, "seconds": round(time.perf_counter() - started, 3)},
+        "profiles": {"rows": count, "columns": columns},
+        "tables": {},
+        "rejected": {},
+    }
+    with open(os.path.join(staging_dir, "manifest.json"), 'w') as f:
+        json.dump(manifest, f, indent=2)
+
+    old_dir = f"{directory}.old-{os.getpid()}"
+    if os.path.exists(directory):
+        os.replace(directory, old_dir)
+    os.replace(staging_dir, directory)
+    shutil.rmtree(old_dir, ignore_errors=True)
+    return manifest
+
+
+def load_applicant_store(directory: str) -> RoommateData:
+    """Memory-maps a pool written by write_applicant_store (or a roommate data cache directory)."""
+    with open(os.path.join(directory, "manifest.json")) as f:
+        manifest = json.load(f)
+    profiles = ColumnTable.load(os.path.join(directory, "profiles"), manifest['profiles']['columns'])
+    tables = {name: ColumnTable.load(os.path.join(directory, "tables", name), info['columns'])
+              for name, info in manifest['tables'].items()}
+    return RoommateData(profiles, tables, manifest)
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Generate a synthetic applicant pool in the columnar store format")
+    parser.add_argument('--count', type=int, default=1000000, help="Applicants to generate")
+    parser.add_argument('--seed', type=int, default=0, help="Same seed, same applicants")
+    parser.add_argument('--output', default='synthetic_applicants', help="Directory to write (replaced if it exists)")
+    parser.add_argument('--workbook', default=ROOMMATE_DATA_PATH, help="Workbook to learn from besides the built-in profiles")
+    args = parser.parse_args()
+
+    model = default_applicant_model(args.workbook)
+    manifest = write_applicant_store(args.output, args.count, args.seed, model)
+    seconds = manifest['source']['seconds']
+
+    print("\n" + "="*60)
+    print("SYNTHETIC APPLICANTS")
+    print("="*60)
+    print(f"   Learned from:  {model.observations} profiles and reference rows")
+    print(f"   Applicants:    {args.count:,} ({len(manifest['profiles']['columns'])} fields, seed {args.seed})")
+    print(f"   Written in:    {seconds:.2f} s ({args.count / max(seconds, 1e-9):,.0f} applicants/s)")
+    print(f"   Store:         {args.output}")
+    print("="*60 + "\n")
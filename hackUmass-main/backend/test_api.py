@@ -0,0 +1,375 @@
+#!/usr/bin/env python3
+"""
+API test suite - calls the FastAPI handlers directly with a stubbed matching pipeline (no server, no API calls)
+"""
+
+import sys
+import os
+import time
+import asyncio
+import json
+import threading
+from concurrent.futures import ThreadPoolExecutor
+sys.path.insert(0, os.path.dirname(__file__))
+
+import main
+
+PIPELINE_DELAY = 0.5
+
+
+def make_profile(user_id):
+    return main.UserProfile(userId=user_id, roomType='double', genderType='female', communityType='academic-focused',
+                            yearStatus='upperclassman', sleepSchedule='balanced', tidinessLevel='tidy')
+
+
+class StubRequest:
+    """Stands in for the Starlette request of a streaming endpoint; `disconnected` is flipped by the test."""
+
+    def __init__(self):
+        self.disconnected = False
+
+    async def is_disconnected(self):
+        return self.disconnected
+
+
+def slow_pipeline(profile, user_id):
+    """Stands in for score_and_rank_matches: blocks like a slow Gemini call."""
+    time.sleep(PIPELINE_DELAY)
+    return {"dorm_recommendation": "Central", "ranked_matches": [], "message": user_id}
+
+
+def with_stubbed_pipeline(coroutine_factory):
+    original = main.score_and_rank_matches
+    main.score_and_rank_matches = slow_pipeline
+    try:
+        return asyncio.run(coroutine_factory())
+    finally:
+        main.score_and_rank_matches = original
+
+
+def test_1_health_not_blocked():
+    """Test that /health answers while a slow match request is running"""
+    print("\n" + "="*60)
+    print("TEST 1: Health Check During Slow Match")
+    print("="*60)
+
+    async def health_probe(start):
+        await asyncio.sleep(0.05)
+        return main.health_check(), time.perf_counter() - start
+
+    async def scenario():
+        start = time.perf_counter()
+        response, (health, health_latency) = await asyncio.gather(
+            main.get_matches(make_profile('user_a')), health_probe(start))
+        return health, health_latency, response
+
+    health, health_latency, response = with_stubbed_pipeline(scenario)
+    print(f"   Health: {health}, answered {health_latency * 1000:.1f} ms after the match started")
+    print(f"   Match finished for: {response.message}")
+
+    if health == {"status": "healthy"} and health_latency < PIPELINE_DELAY / 2 and response.message == 'user_a':
+        print(f"   ✅ PASS: Event loop stays free during matching")
+        return True
+    print(f"   ❌ FAIL: Health check waited for the match")
+    return False
+
+
+def test_2_concurrent_users_not_serialized():
+    """Test that several users are matched in parallel"""
+    print("\n" + "="*60)
+    print("TEST 2: Concurrent Match Requests")
+    print("="*60)
+
+    users = [f"user_{i}" for i in range(min(4, main.MATCH_WORKERS))]
+
+    async def scenario():
+        start = time.perf_counter()
+        responses = await asyncio.gather(*(main.get_matches(make_profile(u)) for u in users))
+        return responses, time.perf_counter() - start
+
+    responses, elapsed = with_stubbed_pipeline(scenario)
+    print(f"   {len(users)} requests took {elapsed:.2f}s (one pipeline run takes {PIPELINE_DELAY}s)")
+
+    if [r.message for r in responses] == users and elapsed < PIPELINE_DELAY * 2:
+        print(f"   ✅ PASS: Requests ran concurrently")
+        return True
+    print(f"   ❌ FAIL: Requests were serialized")
+    return False
+
+
+def test_3_stats_endpoint():
+    """Test that /api/stats reports HTTP pool and score cache counters"""
+    print("\n" + "="*60)
+    print("TEST 3: Stats Endpoint")
+    print("="*60)
+
+    stats = main.get_stats()
+    print(f"   Stats: {stats}")
+
+    if {'requests', 'connectionsOpened', 'connectionsReused'} <= set(stats['http']) and 'hitRate' in stats['scoreCache']:
+        print(f"   ✅ PASS: Stats exposed")
+        return True
+    print(f"   ❌ FAIL: Stats missing fields")
+    return False
+
+
+def test_4_cohort_endpoint_streams_ndjson():
+    """Test that /api/match/batch streams one NDJSON result per submitted profile"""
+    print("\n" + "="*60)
+    print("TEST 4: Cohort Batch Endpoint")
+    print("="*60)
+
+    backend = main.hackumass_backend
+    users = [f"cohort_{i}" for i in range(6)]
+    request = main.CohortMatchRequest(profiles=[make_profile(u) for u in users])
+
+    def offline_api(*args, **kwargs):
+        raise ConnectionError("API offline for tests")
+
+    async def scenario():
+        response = await main.get_cohort_matches(request)
+        body = ""
+        async for chunk in response.body_iterator:
+            body += chunk if isinstance(chunk, str) else chunk.decode('utf-8')
+        return response.media_type, [json.loads(line) for line in body.splitlines()]
+
+    original_call = backend.make_api_call
+    backend.make_api_call = offline_api
+    try:
+        media_type, lines = asyncio.run(scenario())
+    finally:
+        backend.make_api_call = original_call
+
+    returned = sorted((line['index'], line['userId']) for line in lines)
+    print(f"   {media_type}: {len(lines)} lines for {len(users)} profiles")
+    if (media_type == "application/x-ndjson" and returned == list(enumerate(users))
+            and all('dorm_recommendation' in line and isinstance(line['ranked_matches'], list) for line in lines)):
+        print(f"   ✅ PASS: One streamed result per user")
+        return True
+    print(f"   ❌ FAIL: Unexpected stream {returned}")
+    return False
+
+
+def test_5_stream_endpoint_sends_preliminary_first():
+    """Test that /api/match/stream sends the fallback ranking long before the API scores finish"""
+    print("\n" + "="*60)
+    print("TEST 5: Streaming Match Endpoint")
+    print("="*60)
+
+    def streaming_pipeline(profile, user_id, scorer=None, on_event=None):
+        """Stands in for score_and_rank_matches: reports a fallback ranking, then slow API refinements."""
+        on_event("preliminary", {"dorm_recommendation": "Central", "ranked_matches": [{"compatibilityScore": 80}]})
+        for index in range(2):
+            time.sleep(PIPELINE_DELAY / 2)
+            on_event("refinement", {"index": index, "total": 2, "match": {"compatibilityScore": 95}})
+        return {"dorm_recommendation": "Central", "ranked_matches": [{"compatibilityScore": 95}], "message": user_id}
+
+    async def scenario():
+        start = time.perf_counter()
+        response = await main.stream_matches(make_profile('user_stream'), StubRequest())
+        lines, arrivals = [], []
+        async for chunk in response.body_iterator:
+            text = chunk if isinstance(chunk, str) else chunk.decode('utf-8')
+            for line in text.splitlines():
+                lines.append(json.loads(line))
+                arrivals.append(time.perf_counter() - start)
+        return response.media_type, lines, arrivals
+
+    original = main.score_and_rank_matches
+    main.score_and_rank_matches = streaming_pipeline
+    try:
+        media_type, lines, arrivals = asyncio.run(scenario())
+    finally:
+        main.score_and_rank_matches = original
+
+    kinds = [line['type'] for line in lines]
+    print(f"   {media_type}: {kinds}, first line after {arrivals[0] * 1000:.1f} ms, last after {arrivals[-1] * 1000:.1f} ms")
+    if (media_type == "application/x-ndjson" and kinds == ['preliminary', 'refinement', 'refinement', 'final']
+            and arrivals[0] < PIPELINE_DELAY / 4 and lines[-1]['message'] == 'user_stream'):
+        print(f"   ✅ PASS: Preliminary ranking sent immediately, final result last")
+        return True
+    print(f"   ❌ FAIL: Unexpected stream")
+    return False
+
+
+def test_6_metrics_endpoint():
+    """Test that /metrics reports every pipeline stage and the API, fallback and cache counters after a match"""
+    print("\n" + "="*60)
+    print("TEST 6: Prometheus Metrics Endpoint")
+    print("="*60)
+
+    backend = main.hackumass_backend
+
+    def samples():
+        values = {}
+        for line in main.get_metrics().body.decode('utf-8').splitlines():
+            if line and not line.startswith('#'):
+                name, value = line.rsplit(' ', 1)
+                values[name] = float(value)
+        return values
+
+    # Nothing listens on port 9, so every API call fails fast and falls back
+    original_url, original_cache = backend.API_URL, backend.get_score_cache()
+    backend.API_URL = "http://127.0.0.1:9/v1beta/models/test:generateContent"
+    backend.set_score_cache(backend.ScoreCache(path=None))
+    try:
+        before = samples()
+        asyncio.run(main.get_matches(make_profile('user_metrics')))
+        after = samples()
+    finally:
+        backend.API_URL = original_url
+        backend.set_score_cache(original_cache)
+
+    def delta(name):
+        return after.get(name, 0) - before.get(name, 0)
+
+    stages = ['normalization', 'dorm_recommendation', 'candidate_retrieval', 'quick_scoring', 'llm_scoring',
+              'logistical_filter', 'formatting', 'total']
+    counted = {stage: delta(f'umatch_stage_duration_seconds_count{{stage="{stage}"}}') for stage in stages}
+    api_calls, api_errors, fallbacks = delta('umatch_api_calls_total'), delta('umatch_api_errors_total'), delta('umatch_fallback_scores_total')
+    print(f"   Stage observations: {counted}")
+    print(f"   API calls: {api_calls}, errors: {api_errors}, fallbacks: {fallbacks}, cache misses: {delta('umatch_score_cache_misses_total')}")
+    total_buckets = [v for k, v in after.items() if k.startswith('umatch_stage_duration_seconds_bucket{stage="total"')]
+    if (all(count >= 1 for count in counted.values()) and api_calls >= 1 and api_errors == api_calls and fallbacks >= api_calls
+            and total_buckets == sorted(total_buckets) and total_buckets[-1] == after['umatch_stage_duration_seconds_count{stage="total"}']):
+        print(f"   ✅ PASS: Every stage timed, API failures and fallbacks counted")
+        return True
+    print(f"   ❌ FAIL: Missing stages or counters")
+    return False
+
+
+def test_7_stream_stops_on_disconnect():
+    """Test that /api/match/stream stops the pipeline once the client disconnects"""
+    print("\n" + "="*60)
+    print("TEST 7: Streaming Stops on Disconnect")
+    print("="*60)
+
+    delivered = []
+    stopped = []
+
+    def streaming_pipeline(profile, user_id, scorer=None, on_event=None):
+        """Stands in for score_and_rank_matches: one refinement every 0.2 s, noting where on_event stopped it."""
+        try:
+            on_event("preliminary", {"dorm_recommendation": "Central", "ranked_matches": []})
+            for index in range(10):
+                time.sleep(0.2)
+                on_event("refinement", {"index": index, "total": 10, "match": {"compatibilityScore": 90}})
+                delivered.append(index)
+        except main.StreamClosed:
+            stopped.append(len(delivered))
+            raise
+        return {"dorm_recommendation": "Central", "ranked_matches": []}
+
+    async def scenario():
+        request = StubRequest()
+        response = await main.stream_matches(make_profile('user_gone'), request)
+        kinds = []
+        async for chunk in response.body_iterator:
+            kinds.append(json.loads(chunk)['type'])
+            if kinds[-1] == 'refinement':
+                request.disconnected = True  # Client goes away after the first refinement
+        await asyncio.sleep(0.5)
+        return kinds
+
+    original = main.score_and_rank_matches
+    main.score_and_rank_matches = streaming_pipeline
+    try:
+        kinds = asyncio.run(scenario())
+    finally:
+        main.score_and_rank_matches = original
+
+    print(f"   Lines sent: {kinds}, refinements produced: {len(delivered)}, pipeline stopped: {bool(stopped)}")
+    if kinds == ['preliminary', 'refinement'] and stopped and len(delivered) <= 2:
+        print(f"   ✅ PASS: Stream ended and the pipeline stopped at its next progress report")
+        return True
+    print(f"   ❌ FAIL: Pipeline kept running after the client left")
+    return False
+
+
+def test_8_cohort_stream_closed_early():
+    """Test that a client leaving /api/match/batch early cancels the remaining users on the shared, bounded pool"""
+    print("\n" + "="*60)
+    print("TEST 8: Cohort Stream Closed Early")
+    print("="*60)
+
+    backend = main.hackumass_backend
+    started = []
+
+    def slow_user(profile, user_id, scorer=None):
+        started.append(user_id)
+        time.sleep(0.2)
+        return {"dorm_recommendation": "Central", "ranked_matches": [], "message": user_id}
+
+    async def scenario():
+        requests = [main.CohortMatchRequest(profiles=[make_profile(f"early_{n}_{i}") for i in range(20)]) for n in range(2)]
+        responses = [await main.get_cohort_matches(request) for request in requests]
+        iterators = [response.body_iterator for response in responses]
+        first = await asyncio.gather(*(iterator.__anext__() for iterator in iterators))
+        threads = sum(1 for t in threading.enumerate() if t.name.startswith("cohort-test"))
+        at_close = len(started)
+        for iterator in iterators:
+            await iterator.aclose()  # Client went away after the first line
+        await asyncio.sleep(0.8)
+        return first, threads, at_close
+
+    original_match, original_pool = backend.score_and_rank_matches, backend._cohort_executor
+    backend.score_and_rank_matches = slow_user
+    backend._cohort_executor = ThreadPoolExecutor(max_workers=2, thread_name_prefix="cohort-test")
+    try:
+        first, threads, at_close = asyncio.run(scenario())
+        ran = len(started)
+    finally:
+        backend._cohort_executor.shutdown(wait=True)
+        backend.score_and_rank_matches, backend._cohort_executor = original_match, original_pool
+
+    print(f"   First lines: {[json.loads(line)['userId'] for line in first]}, cohort threads: {threads}")
+    print(f"   Users started: {at_close} before the clients left, {ran} in total of 40")
+    if len(first) == 2 and threads <= 2 and ran - at_close <= 2:
+        print(f"   ✅ PASS: Both cohorts shared two threads and stopped once their clients left")
+        return True
+    print(f"   ❌ FAIL: Pool not shared or users kept running")
+    return False
+
+
+# Run all tests
+if __name__ == "__main__":
+    print("\n" + "="*60)
+    print("API TEST SUITE")
+    print("="*60)
+
+    tests = [
+        ("Health Check During Slow Match", test_1_health_not_blocked),
+        ("Concurrent Match Requests", test_2_concurrent_users_not_serialized),
+        ("Stats Endpoint", test_3_stats_endpoint),
+        ("Cohort Batch Endpoint", test_4_cohort_endpoint_streams_ndjson),
+        ("Streaming Match Endpoint", test_5_stream_endpoint_sends_preliminary_first),
+        ("Prometheus Metrics Endpoint", test_6_metrics_endpoint),
+        ("Streaming Stops on Disconnect", test_7_stream_stops_on_disconnect),
+        ("Cohort Stream Closed Early", test_8_cohort_stream_closed_early),
+    ]
+
+    results = []
+    for name, test_func in tests:
+        try:
+            result = test_func()
+            results.append((name, result))
+        except Exception as e:
+            print(f"\n   ❌ ERROR: {str(e)}")
+            import traceback
+            traceback.print_exc()
+            results.append((name, False))
+
+    # Summary
+    print("\n" + "="*60)
+    print("SUMMARY")
+    print("="*60)
+
+    passed = sum(1 for _, r in results if r)
+    total = len(results)
+
+    for name, result in results:
+        status = "✅ PASS" if result else "❌ FAIL"
+        print(f"{status} - {name}")
+
+    print(f"\nTotal: {passed}/{total} tests passed")
+    print("="*60 + "\n")
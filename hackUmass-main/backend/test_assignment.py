@@ -0,0 +1,196 @@
+#!/usr/bin/env python3
+"""
+Roommate assignment test suite - checks assign_double_rooms against the matching rules, a brute-force optimum and the exact solver
+"""
+
+import sys
+import os
+import time
+import random
+from functools import lru_cache
+sys.path.insert(0, os.path.dirname(__file__))
+
+import HackUmass_back_end as backend
+
+AREAS = ['Central', 'Southwest', 'Orchard Hill', 'Northeast', 'North', 'Sylvan', 'CHCRC']
+
+
+def make_population(count, seed=1, areas=AREAS, double_share=0.9):
+    """Random applicants with every fallback trait and logistical preference drawn independently."""
+    rng = random.Random(seed)
+    return [
+        dict(
+            userId=f"student_{i}", name=f"Student {i}", dormArea=rng.choice(areas),
+            roomType='double' if rng.random() < double_share else 'single',
+            studentYear=rng.choice(['first-years', 'upperclassmen']),
+            breakHousingPref=rng.choice(['required', 'no', 'no']),
+            alcoholPref=rng.choice(['required', 'no-preference', 'no-preference', 'no-preference']),
+            genderInclusivePref=rng.choice(['single-gender', 'gender-inclusive', 'no-preference']),
+            **{trait: rng.choice(values) for trait, values in backend.FALLBACK_TRAIT_VALUES.items()},
+        )
+        for i in range(count)
+    ]
+
+
+def pair_score(profile_a, profile_b):
+    """What assign_double_rooms may pair these two applicants at, or 0 if it must not pair them."""
+    if (profile_a['dormArea'] != profile_b['dormArea']
+            or backend.get_profile_student_year(profile_a) != backend.get_profile_student_year(profile_b)):
+        return 0
+    if backend.get_profile_student_year(profile_a) == 'first-years' and profile_a['dormArea'].lower() in backend.RESTRICTED_UPPERCLASS_AREAS:
+        return 0
+    for user, candidate in ((profile_a, profile_b), (profile_b, profile_a)):
+        if not backend.final_logistical_filter(user, [dict(candidate, candidateDorm=candidate['dormArea'])]):
+            return 0
+    score = min(backend.calculate_fallback_score(profile_a, profile_b), backend.calculate_fallback_score(profile_b, profile_a))
+    return score if score >= backend.get_min_compatibility_threshold('double') else 0
+
+
+def best_pairing(profiles):
+    """(total, pairs) of an optimal pairing, by exhaustive search."""
+    weights = [[pair_score(a, b) for b in profiles] for a in profiles]
+
+    @lru_cache(maxsize=None)
+    def best(taken):
+        first = next((i for i in range(len(profiles)) if not taken >> i & 1), None)
+        if first is None:
+            return 0, 0
+        options = [best(taken | 1 << first)]
+        for j in range(first + 1, len(profiles)):
+            if not taken >> j & 1 and weights[first][j] > 0:
+                total, pairs = best(taken | 1 << first | 1 << j)
+                options.append((total + weights[first][j], pairs + 1))
+        return max(options)
+
+    return best(0)
+
+
+def test_1_pairs_follow_matching_rules():
+    """Test that every pair shares an area and year, passes the logistical filter both ways and scores 75+"""
+    print("\n" + "="*60)
+    print("TEST 1: Pairs Follow the Matching Rules")
+    print("="*60)
+
+    profiles = make_population(3000)
+    assignment = backend.assign_double_rooms(backend.CandidateStore(profiles))
+    positions = [p for a, b, _ in assignment.pairs for p in (a, b)] + assignment.unassigned
+    doubles = [i for i, p in enumerate(profiles) if p['roomType'] == 'double']
+    bad_pairs = [(a, b) for a, b, score in assignment.pairs if pair_score(profiles[a], profiles[b]) != score or score == 0]
+
+    print(f"   {assignment.stats}")
+    if sorted(positions) == doubles and not bad_pairs:
+        print(f"   ✅ PASS: {len(assignment.pairs)} valid pairs, every double-room applicant placed once")
+        return True
+    print(f"   ❌ FAIL: {len(bad_pairs)} invalid pairs, applicants covered: {sorted(positions) == doubles}")
+    return False
+
+
+def test_2_matches_brute_force():
+    """Test that the exact solver finds the same total and pair count as an exhaustive search"""
+    print("\n" + "="*60)
+    print("TEST 2: Solver vs Brute-Force Optimum")
+    print("="*60)
+
+    off_optimum = []
+    for seed in range(150):
+        profiles = make_population(12, seed, areas=['Central'], double_share=1.0)
+        stats = backend.assign_double_rooms(backend.CandidateStore(profiles)).stats
+        optimum, optimum_pairs = best_pairing(profiles)
+        if (stats['pairs'], stats['totalCompatibility'], stats['upperBound'], stats['heuristicBlocks']) != (optimum_pairs, optimum, optimum, 0):
+            off_optimum.append(seed)
+
+    print(f"   150 populations of 12: {len(off_optimum)} off the optimum")
+    if not off_optimum:
+        print(f"   ✅ PASS: Optimal totals and pair counts")
+        return True
+    print(f"   ❌ FAIL: Seeds {off_optimum}")
+    return False
+
+
+def test_3_scales_to_20k_students():
+    """Test that 20,000 applicants are assigned in well under the allocation run's time budget"""
+    print("\n" + "="*60)
+    print("TEST 3: 20,000 Applicants")
+    print("="*60)
+
+    store = backend.CandidateStore(make_population(20000, seed=3))
+    start = time.perf_counter()
+    stats = backend.assign_double_rooms(store).stats
+    elapsed = time.perf_counter() - start
+
+    print(f"   {stats['students']} applicants, {stats['pairs']} pairs, total {stats['totalCompatibility']} "
+          f"(bound {stats['upperBound']}, min {stats['minCompatibility']}) in {elapsed:.1f}s")
+    print(f"   Blocks: {stats['exactBlocks']} exact, {stats['heuristicBlocks']} heuristic (over {backend.ASSIGNMENT_EXACT_MAX_BLOCK} applicants)")
+    if elapsed < 120 and stats['totalCompatibility'] >= 0.98 * stats['upperBound']:
+        print(f"   ✅ PASS: Assigned within 2% of the upper bound")
+        return True
+    print(f"   ❌ FAIL: Too slow or too far from the bound")
+    return False
+
+
+def test_4_heuristic_vs_exact():
+    """Test that the class heuristic used for large blocks stays close to the exact solver on small random instances"""
+    print("\n" + "="*60)
+    print("TEST 4: Heuristic vs Exact Solver")
+    print("="*60)
+
+    failures = []
+    worst_ratio = 1.0
+    for seed in range(40):
+        profiles = make_population(random.Random(seed).randrange(20, 160), seed, areas=['Central', 'Southwest'])
+        store = backend.CandidateStore(profiles)
+        exact = backend.assign_double_rooms(store)
+        heuristic = backend.assign_double_rooms(store, exact_max_block=0)
+        bad_pairs = [(a, b) for a, b, score in heuristic.pairs if pair_score(profiles[a], profiles[b]) != score or score == 0]
+        exact_total, heuristic_total = exact.stats['totalCompatibility'], heuristic.stats['totalCompatibility']
+        if bad_pairs or not heuristic_total <= exact_total <= heuristic.stats['upperBound'] or exact.stats['heuristicBlocks']:
+            failures.append(seed)
+        if exact_total:
+            worst_ratio = min(worst_ratio, heuristic_total / exact_total)
+
+    print(f"   40 populations of 20-160: {len(failures)} invalid, worst heuristic total {worst_ratio:.1%} of optimal")
+    if not failures and worst_ratio >= 0.97:
+        print(f"   ✅ PASS: Heuristic pairs valid, within 3% of the exact solver and below its own bound")
+        return True
+    print(f"   ❌ FAIL: Seeds {failures}")
+    return False
+
+
+# Run all tests
+if __name__ == "__main__":
+    print("\n" + "="*60)
+    print("ROOMMATE ASSIGNMENT TEST SUITE")
+    print("="*60)
+
+    tests = [
+        ("Matching Rules", test_1_pairs_follow_matching_rules),
+        ("Brute-Force Optimum", test_2_matches_brute_force),
+        ("20k Applicants", test_3_scales_to_20k_students),
+        ("Heuristic vs Exact Solver", test_4_heuristic_vs_exact),
+    ]
+
+    results = []
+    for name, test_func in tests:
+        try:
+            result = test_func()
+            results.append((name, result))
+        except Exception as e:
+            print(f"\n   ❌ ERROR: {str(e)}")
+            import traceback
+            traceback.print_exc()
+            results.append((name, False))
+
+    # Summary
+    print("\n" + "="*60)
+    print("SUMMARY")
+    print("="*60)
+
+    passed = sum(1 for _, r in results if r)
+    total = len(results)
+
+    for name, result in results:
+        status = "✅ PASS" if result else "❌ FAIL"
+        print(f"{status} - {name}")
+
+    print(f"\nTotal: {passed}/{total} tests passed")
+    print("="*60 + "\n")
@@ -0,0 +1,174 @@
+#!/usr/bin/env python3
+"""
+Batch scoring test suite - checks the vectorized fallback scorer against calculate_fallback_score
+"""
+
+import sys
+import os
+import time
+import random
+import itertools
+sys.path.insert(0, os.path.dirname(__file__))
+
+from HackUmass_back_end import (
+    FALLBACK_TRAIT_RULES,
+    FALLBACK_TRAIT_VALUES,
+    batch_fallback_scores,
+    calculate_fallback_score,
+    encode_fallback_trait_array,
+)
+from benchmark_matching import legacy_fallback_score
+
+MISSING = object()
+
+
+def build_trait_profiles():
+    """Every combination of known values, an unknown value, None and a missing key for each trait."""
+    options = []
+    for key, *_ in FALLBACK_TRAIT_RULES:
+        options.append(FALLBACK_TRAIT_VALUES[key] + ['not-a-real-answer', None, MISSING])
+
+    profiles = []
+    for combination in itertools.product(*options):
+        profile = {}
+        for (key, *_), value in zip(FALLBACK_TRAIT_RULES, combination):
+            if value is not MISSING:
+                profile[key] = value
+        profiles.append(profile)
+    return profiles
+
+
+def test_1_batch_matches_scalar():
+    """Test that batch scores equal calculate_fallback_score for every trait combination"""
+    print("\n" + "="*60)
+    print("TEST 1: Batch Scores vs Scalar Scores")
+    print("="*60)
+
+    profiles = build_trait_profiles()
+    candidate_codes = encode_fallback_trait_array(profiles)
+    rng = random.Random(7)
+    users = rng.sample(profiles, 40)
+
+    mismatches = 0
+    for user in users:
+        batch = batch_fallback_scores(user, candidate_codes).tolist()
+        scalar = [calculate_fallback_score(user, candidate) for candidate in profiles]
+        mismatches += sum(1 for b, s in zip(batch, scalar) if b != s)
+
+    print(f"   Compared {len(users)} users x {len(profiles)} candidates, {mismatches} mismatches")
+    if mismatches == 0:
+        print(f"   ✅ PASS: Batch scorer returns identical scores")
+        return True
+    print(f"   ❌ FAIL: Batch scorer differs from calculate_fallback_score")
+    return False
+
+
+def test_2_clamp_and_conflicts():
+    """Test the 75 clamp and the zero score for a major conflict"""
+    print("\n" + "="*60)
+    print("TEST 2: Clamp to 75 and Major Conflicts")
+    print("="*60)
+
+    user = {'sleepSchedule': 'early-bird', 'tidiness': 'very-tidy', 'noiseLevel': 'very-quiet', 'socialLevel': 'minimal-social'}
+    candidates = [
+        dict(user),                                                     # identical → 80
+        dict(user, socialLevel='moderately-social'),                    # minor → 77
+        dict(user, sleepSchedule='balanced', tidiness='tidy'),          # minor only, below 75 → 75
+        dict(user, sleepSchedule='night-owl'),                          # major conflict → 0
+    ]
+    scores = batch_fallback_scores(user, encode_fallback_trait_array(candidates)).tolist()
+    print(f"   Scores: {scores}")
+
+    if scores == [80, 77, 75, 0]:
+        print(f"   ✅ PASS: Clamp and conflict rules preserved")
+        return True
+    print(f"   ❌ FAIL: Expected [80, 77, 75, 0]")
+    return False
+
+
+def test_3_large_batch_speed():
+    """Test scoring one user against 100k candidates"""
+    print("\n" + "="*60)
+    print("TEST 3: 100k Candidate Batch")
+    print("="*60)
+
+    rng = random.Random(11)
+    profiles = build_trait_profiles()
+    candidate_codes = encode_fallback_trait_array(rng.choice(profiles) for _ in range(100000))
+    user = {'sleepSchedule': 'balanced', 'tidiness': 'tidy', 'noiseLevel': 'quiet', 'socialLevel': 'moderately-social'}
+
+    batch_fallback_scores(user, candidate_codes)
+    start = time.perf_counter()
+    scores = batch_fallback_scores(user, candidate_codes)
+    elapsed_ms = (time.perf_counter() - start) * 1000
+    print(f"   Scored {len(scores)} candidates in {elapsed_ms:.2f} ms")
+
+    if len(scores) == 100000 and elapsed_ms < 100:
+        print(f"   ✅ PASS: 100k candidates scored in milliseconds")
+        return True
+    print(f"   ❌ FAIL: Batch scoring too slow")
+    return False
+
+
+def test_4_tables_match_original_rules():
+    """Test that the penalty tables reproduce the original if/elif scoring rules"""
+    print("\n" + "="*60)
+    print("TEST 4: Penalty Tables vs Original Rules")
+    print("="*60)
+
+    profiles = build_trait_profiles()
+    rng = random.Random(3)
+    users = rng.sample(profiles, 40)
+
+    mismatches = 0
+    for user in users:
+        for candidate in profiles:
+            if calculate_fallback_score(user, candidate) != legacy_fallback_score(user, candidate):
+                mismatches += 1
+
+    print(f"   Compared {len(users)} users x {len(profiles)} candidates, {mismatches} mismatches")
+    if mismatches == 0:
+        print(f"   ✅ PASS: Table lookups match the original rules")
+        return True
+    print(f"   ❌ FAIL: Table lookups differ from the original rules")
+    return False
+
+
+# Run all tests
+if __name__ == "__main__":
+    print("\n" + "="*60)
+    print("BATCH SCORING TEST SUITE")
+    print("="*60)
+
+    tests = [
+        ("Batch Scores vs Scalar Scores", test_1_batch_matches_scalar),
+        ("Clamp and Major Conflicts", test_2_clamp_and_conflicts),
+        ("100k Candidate Batch", test_3_large_batch_speed),
+        ("Penalty Tables vs Original Rules", test_4_tables_match_original_rules),
+    ]
+
+    results = []
+    for name, test_func in tests:
+        try:
+            result = test_func()
+            results.append((name, result))
+        except Exception as e:
+            print(f"\n   ❌ ERROR: {str(e)}")
+            import traceback
+            traceback.print_exc()
+            results.append((name, False))
+
+    # Summary
+    print("\n" + "="*60)
+    print("SUMMARY")
+    print("="*60)
+
+    passed = sum(1 for _, r in results if r)
+    total = len(results)
+
+    for name, result in results:
+        status = "✅ PASS" if result else "❌ FAIL"
+        print(f"{status} - {name}")
+
+    print(f"\nTotal: {passed}/{total} tests passed")
+    print("="*60 + "\n")
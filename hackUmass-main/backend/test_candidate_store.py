@@ -0,0 +1,493 @@
+#!/usr/bin/env python3
+"""
+Candidate store test suite - checks the indexed candidate store against a linear scan
+"""
+
+import sys
+import os
+import time
+import glob
+import subprocess
+import tempfile
+import tracemalloc
+import itertools
+import numpy as np
+import pandas as pd
+sys.path.insert(0, os.path.dirname(__file__))
+
+from HackUmass_back_end import (
+    CandidateStore,
+    ProfileTable,
+    SIMULATED_PROFILES,
+    build_match_result,
+    final_logistical_filter,
+    logistical_prefilter_mask,
+    RESIDENTIAL_AREA_TO_HALLS,
+    TRIPLE_ROOM_AREAS,
+    QUAD_ROOM_AREAS,
+    get_all_profiles_from_db,
+    get_candidate_store,
+    load_roommate_data,
+)
+import HackUmass_back_end as backend
+
+ALL_AREAS = list(RESIDENTIAL_AREA_TO_HALLS.keys())
+
+
+def linear_scan(profiles, current_user_id, dorm_areas, student_year):
+    """Reference implementation: the original full scan over every profile."""
+    required_year = str(student_year).lower()
+    normalized_required_year = required_year
+    if required_year in ['first-year', 'freshman', 'freshmen']:
+        normalized_required_year = 'first-years'
+    elif required_year in ['upperclassman']:
+        normalized_required_year = 'upperclassmen'
+
+    return [
+        p for p in profiles
+        if p.get('userId') != current_user_id
+        and p.get('dormArea') in dorm_areas
+        and (
+            str(p.get('yearPref', '')).lower() == normalized_required_year or
+            str(p.get('yearPref', '')).lower() == required_year or
+            str(p.get('studentYear', '')).lower() == normalized_required_year or
+            str(p.get('studentYear', '')).lower() == required_year
+        )
+        and not (str(p.get('dormArea', '')).lower() in ['north', 'sylvan'] and normalized_required_year == 'first-years')
+        and (
+            (str(p.get('roomType', '')).lower() != 'triple' or str(p.get('dormArea', '')).strip() in TRIPLE_ROOM_AREAS)
+            and
+            (str(p.get('roomType', '')).lower() != 'quad' or str(p.get('dormArea', '')).strip() in QUAD_ROOM_AREAS)
+        )
+    ]
+
+
+def test_1_matches_linear_scan():
+    """Test indexed lookups return the same candidates, in the same order, as a full scan"""
+    print("\n" + "="*60)
+    print("TEST 1: Indexed Lookup vs Linear Scan")
+    print("="*60)
+
+    store = CandidateStore(SIMULATED_PROFILES)
+    area_sets = [[area] for area in ALL_AREAS] + [ALL_AREAS, TRIPLE_ROOM_AREAS, QUAD_ROOM_AREAS, ['Unknown']]
+    years = ['first-years', 'first-year', 'freshman', 'upperclassmen', 'upperclassman']
+    excluded_ids = ['test', 'candidate_2', 'triple_central_1']
+
+    mismatches = 0
+    checked = 0
+    for areas in area_sets:
+        for year in years:
+            for user_id in excluded_ids:
+                expected = [p['userId'] for p in linear_scan(SIMULATED_PROFILES, user_id, areas, year)]
+                actual = [p['userId'] for p in store.query(areas, year, exclude_user_id=user_id)]
+                checked += 1
+                if expected != actual:
+                    mismatches += 1
+                    print(f"   ❌ {areas} / {year} / {user_id}: expected {expected}, got {actual}")
+
+    print(f"   Checked {checked} lookups, {mismatches} mismatches")
+    if mismatches == 0:
+        print(f"   ✅ PASS: Indexed store matches the linear scan")
+        return True
+    print(f"   ❌ FAIL: Indexed store differs from the linear scan")
+    return False
+
+
+def test_2_store_built_once():
+    """Test that the shared store is reused across calls"""
+    print("\n" + "="*60)
+    print("TEST 2: Store Built Once")
+    print("="*60)
+
+    store = get_candidate_store()
+    get_all_profiles_from_db('test', ['Central'], 'upperclassmen')
+    get_all_profiles_from_db('test', ['Southwest'], 'first-years')
+
+    if get_candidate_store() is store and len(store) == len(SIMULATED_PROFILES):
+        print(f"   ✅ PASS: Same store instance with {len(store)} profiles")
+        return True
+    print(f"   ❌ FAIL: Store was rebuilt or has the wrong size")
+    return False
+
+
+def test_3_lookup_scales_with_result_size():
+    """Test that a small bucket lookup does not scan a large population"""
+    print("\n" + "="*60)
+    print("TEST 3: Lookup Cost vs Population Size")
+    print("="*60)
+
+    population = []
+    for i in range(50000):
+        profile = dict(SIMULATED_PROFILES[i % len(SIMULATED_PROFILES)])
+        profile['userId'] = f"synthetic_{i}"
+        # Keep Sylvan tiny so its bucket is much smaller than the population
+        if profile['dormArea'] == 'Sylvan' and i >= len(SIMULATED_PROFILES):
+            profile['dormArea'] = 'Central'
+        population.append(profile)
+    store = CandidateStore(population)
+
+    start = time.perf_counter()
+    for _ in range(1000):
+        small = store.query(['Sylvan'], 'upperclassmen', exclude_user_id='test')
+    elapsed_ms = (time.perf_counter() - start) * 1000
+
+    print(f"   Population: {len(store)}, Sylvan upperclassmen: {len(small)}")
+    print(f"   1000 lookups took {elapsed_ms:.1f} ms")
+
+    if len(small) == 1 and elapsed_ms < 500:
+        print(f"   ✅ PASS: Small lookups stay fast on a large population")
+        return True
+    print(f"   ❌ FAIL: Lookup cost grew with the population")
+    return False
+
+
+APPLICANT_HEADERS = ['User ID', 'Name', 'Dorm Area', 'Room Type', 'Year Status', 'Sleep Schedule', 'Tidiness Level',
+                     'Noise Level', 'Social Level', 'Priority Location']
+
+
+def write_workbook(path, applicant_rows):
+    """Workbook with an applicant sheet and a reference sheet, laid out like Roommate_data.xlsx."""
+    with pd.ExcelWriter(path) as writer:
+        pd.DataFrame(applicant_rows, columns=APPLICANT_HEADERS).to_excel(writer, sheet_name='Applicants', index=False)
+        pd.DataFrame([['Central', 'Central Core', 4], ['Sylvan', 'Far Zone', 1]],
+                     columns=['Dormitory Area', 'Primary Academic Zone', 'Proximity Score (1-5)']).to_excel(writer, sheet_name='Areas', index=False)
+
+
+def test_4_workbook_ingestion():
+    """Test that workbook rows are validated and normalized to the profile schema"""
+    print("\n" + "="*60)
+    print("TEST 4: Workbook Ingestion")
+    print("="*60)
+
+    rows = [
+        ['xl_1', 'Riley', 'central', 'Double', 'upperclassman', 'Night Owl', 'Very Tidy', 'quiet', 'Moderately Social', 1.0],
+        ['xl_2', 'Sam', 'CHCRC (Honors)', 'double', 'first-year', 'early-bird', 'tidy', 'Very Quiet', 'minimal-social', 2.0],
+        ['xl_3', 'Bad Area', 'Mars', 'double', 'upperclassman', 'balanced', 'tidy', 'quiet', 'very-social', None],
+        ['xl_4', 'Bad Room', 'Central', 'penthouse', 'upperclassman', 'balanced', 'tidy', 'quiet', 'very-social', None],
+        ['xl_1', 'Duplicate', 'Central', 'double', 'upperclassman', 'balanced', 'tidy', 'quiet', 'very-social', None],
+        [None, 'No ID', 'Central', 'double', 'upperclassman', 'balanced', 'tidy', 'quiet', 'very-social', None],
+    ]
+    with tempfile.TemporaryDirectory() as tmp:
+        xlsx_path = os.path.join(tmp, 'applicants.xlsx')
+        write_workbook(xlsx_path, rows)
+        data = load_roommate_data(xlsx_path, os.path.join(tmp, 'cache'))
+        profiles = data.profiles.rows()
+        tables = {name: table.rows() for name, table in data.tables.items()}
+
+    print(f"   Profiles: {profiles}")
+    print(f"   Rejected: {data.manifest['rejected']}")
+    print(f"   Reference tables: {tables}")
+
+    riley = profiles[0] if profiles else {}
+    checks = [
+        [p['userId'] for p in profiles] == ['xl_1', 'xl_2'],
+        riley.get('dormArea') == 'Central' and riley.get('roomType') == 'double',
+        riley.get('studentYear') == 'upperclassmen' and riley.get('yearPref') == 'upperclassmen',
+        riley.get('sleepSchedule') == 'night-owl' and riley.get('tidiness') == 'very-tidy' and riley.get('priorityLocation') == '1',
+        profiles[1].get('dormArea') == 'CHCRC' and profiles[1].get('studentYear') == 'first-years',
+        data.manifest['rejected'] == {'unknown dormArea': 1, 'unknown roomType': 1, 'duplicate userId': 1, 'missing userId': 1},
+        tables.get('areas_dormitory_area', [{}])[0].get('proximity_score_1_5') == '4',
+        [p['userId'] for p in CandidateStore(profiles).query(['Central'], 'upperclassman')] == ['xl_1'],
+    ]
+    if all(checks):
+        print(f"   ✅ PASS: Rows validated, normalized and queryable")
+        return True
+    print(f"   ❌ FAIL: Checks {checks}")
+    return False
+
+
+def test_5_cache_reuse_and_rebuild():
+    """Test that later loads come from the .npy cache and rebuild only when the workbook changes"""
+    print("\n" + "="*60)
+    print("TEST 5: Columnar Cache Reuse and Rebuild")
+    print("="*60)
+
+    row = ['xl_1', 'Riley', 'Central', 'double', 'upperclassman', 'night-owl', 'tidy', 'quiet', 'very-social', 1]
+    original_read_excel = backend.pd.read_excel
+    parses = []
+
+    def counting_read_excel(*args, **kwargs):
+        parses.append(args)
+        return original_read_excel(*args, **kwargs)
+
+    backend.pd.read_excel = counting_read_excel
+    try:
+        with tempfile.TemporaryDirectory() as tmp:
+            xlsx_path, cache_dir = os.path.join(tmp, 'applicants.xlsx'), os.path.join(tmp, 'cache')
+            write_workbook(xlsx_path, [row])
+            load_roommate_data(xlsx_path, cache_dir)
+
+            start = time.perf_counter()
+            cached = load_roommate_data(xlsx_path, cache_dir)
+            cached_ms = (time.perf_counter() - start) * 1000
+            parses_after_cached = len(parses)
+
+            os.utime(xlsx_path, (time.time() + 10, time.time() + 10))
+            touched = load_roommate_data(xlsx_path, cache_dir)
+            parses_after_touch = len(parses)
+
+            write_workbook(xlsx_path, [row, ['xl_2'] + row[1:]])
+            changed = load_roommate_data(xlsx_path, cache_dir)
+            parses_after_change = len(parses)
+            memory_mapped = hasattr(cached.profiles.codes['userId'], 'filename')
+    finally:
+        backend.pd.read_excel = original_read_excel
+
+    print(f"   Cached load: {cached_ms:.1f} ms, memory-mapped: {memory_mapped}")
+    print(f"   Workbook parses: initial + {parses_after_cached - 1} cached, {parses_after_touch - parses_after_cached} after touch, "
+          f"{parses_after_change - parses_after_touch} after change")
+
+    if (parses_after_cached == 1 and parses_after_touch == 1 and parses_after_change == 2 and memory_mapped
+            and len(cached.profiles) == 1 and len(touched.profiles) == 1 and len(changed.profiles) == 2 and cached_ms < 100):
+        print(f"   ✅ PASS: Cache reused until the workbook content changed")
+        return True
+    print(f"   ❌ FAIL: Cache not reused or not rebuilt")
+    return False
+
+
+def test_6_shipped_workbook():
+    """Test that the shipped Roommate_data.xlsx ingests as reference tables without disturbing the store"""
+    print("\n" + "="*60)
+    print("TEST 6: Shipped Roommate_data.xlsx")
+    print("="*60)
+
+    xlsx_path = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'Roommate_data.xlsx')
+    with tempfile.TemporaryDirectory() as tmp:
+        data = load_roommate_data(xlsx_path, os.path.join(tmp, 'cache'))
+        tables = {name: len(table) for name, table in data.tables.items()}
+
+    print(f"   Profiles: {len(data.profiles)}, reference tables: {tables}")
+    if len(data.profiles) == 0 and tables.get('sheet1_college') == 10 and len(get_candidate_store()) == len(SIMULATED_PROFILES):
+        print(f"   ✅ PASS: Reference tables cached, candidate store unchanged")
+        return True
+    print(f"   ❌ FAIL: Unexpected workbook contents")
+    return False
+
+
+def make_applicant(i):
+    """A SIMULATED_PROFILES answer sheet under a new id and name."""
+    return dict(SIMULATED_PROFILES[i % len(SIMULATED_PROFILES)], userId=f"applicant_{i:07d}", name=f"Applicant Number {i}")
+
+
+def test_7_profile_views():
+    """Test that Profile views read back exactly what was stored"""
+    print("\n" + "="*60)
+    print("TEST 7: Profile Views Round Trip")
+    print("="*60)
+
+    odd_profiles = [
+        {'userId': 'odd_1', 'sleepSchedule': None, 'priorities': {'location': '1'}, 'recommended_dorm': 'Central'},
+        {'name': 'No Id', 'studentYear': 1, 'accessible': True, 'tidiness': 1.0},
+        {'userId': 42, 'name': 'Ünïcödé Nâme', 'sharedInterests': ['music', 'hiking']},
+    ]
+    profiles = SIMULATED_PROFILES + odd_profiles
+    table = ProfileTable(profiles)
+
+    mismatches = [i for i, (view, original) in enumerate(zip(table, profiles))
+                  if view != original or view.to_dict() != original
+                  or any(view.get(k) != v or view[k] != v for k, v in original.items())]
+    view = table[len(SIMULATED_PROFILES)]
+    lookups_ok = (view.get('tidiness', 'default') == 'default' and 'tidiness' not in view
+                  and 'sleepSchedule' in view and view.get('sleepSchedule', 'default') is None)
+    types_ok = [type(table[-2].get(k)) for k in ('studentYear', 'accessible', 'tidiness')] == [int, bool, float]
+
+    print(f"   {len(profiles)} profiles, {len(mismatches)} mismatches, missing/None lookups ok: {lookups_ok}, types kept: {types_ok}")
+    if not mismatches and lookups_ok and types_ok:
+        print(f"   ✅ PASS: Views behave like the original dicts")
+        return True
+    print(f"   ❌ FAIL: Views differ from the stored profiles at {mismatches}")
+    return False
+
+
+def test_8_profile_memory():
+    """Test that ProfileTable uses at least 5x less memory per profile than dicts"""
+    print("\n" + "="*60)
+    print("TEST 8: Per-Profile Memory")
+    print("="*60)
+
+    count = 50000
+    tracemalloc.start()
+    profiles = [make_applicant(i) for i in range(count)]
+    dict_bytes = tracemalloc.get_traced_memory()[0] / count
+    del profiles
+    tracemalloc.stop()
+
+    tracemalloc.start()
+    table = ProfileTable(make_applicant(i) for i in range(count))
+    table_bytes = tracemalloc.get_traced_memory()[0] / count
+    tracemalloc.stop()
+
+    ratio = dict_bytes / table_bytes
+    print(f"   Dicts: {dict_bytes:.0f} bytes/profile, ProfileTable: {table_bytes:.0f} bytes/profile ({ratio:.1f}x smaller)")
+    if ratio >= 5 and table[count - 1].to_dict() == make_applicant(count - 1):
+        print(f"   ✅ PASS: Profiles stored compactly")
+        return True
+    print(f"   ❌ FAIL: Less than 5x saving")
+    return False
+
+
+def test_9_logistical_prefilter():
+    """Test that the store prefilter keeps exactly the candidates final_logistical_filter keeps"""
+    print("\n" + "="*60)
+    print("TEST 9: Logistical Prefilter vs Final Filter")
+    print("="*60)
+
+    odd_candidates = [
+        {'userId': 'blank_1', 'name': 'No Answers'},
+        {'userId': 'blank_2', 'name': 'Null Answers', 'dormArea': None, 'noiseLevel': None, 'genderInclusivePref': None},
+        {'userId': 'blank_3', 'name': 'Empty Answers', 'dormArea': '', 'noiseLevel': '', 'alcoholPref': ''},
+    ]
+    candidates = SIMULATED_PROFILES + odd_candidates
+    store = CandidateStore(candidates)
+    positions = np.arange(len(store))
+    matches = [build_match_result(profile, {'compatibilityScore': 90}, 75) for profile in candidates]
+
+    users = [
+        dict(zip(['breakHousingPref', 'noiseLevel', 'alcoholPref', 'genderInclusivePref'], values))
+        for values in itertools.product(['required', 'no'], ['very-quiet', 'loud', 'balanced'],
+                                        ['required', 'no-preference'], ['single-gender', 'gender-inclusive'])
+    ]
+    mismatches = 0
+    for user in users:
+        kept = logistical_prefilter_mask(user, store.profiles, positions)
+        expected = [any(m is match for m in final_logistical_filter(user, matches)) for match in matches]
+        mismatches += int((kept != np.array(expected)).sum())
+
+    print(f"   {len(users)} constraint combinations x {len(candidates)} candidates, {mismatches} mismatches")
+    if mismatches == 0:
+        print(f"   ✅ PASS: Prefilter agrees with final_logistical_filter")
+        return True
+    print(f"   ❌ FAIL: Prefilter and final filter disagree")
+    return False
+
+
+def test_10_column_reads():
+    """Test that column reads match per-view reads, and are faster than them"""
+    print("\n" + "="*60)
+    print("TEST 10: Column Reads vs Profile Views")
+    print("="*60)
+
+    odd_profiles = [
+        {'userId': 'odd_1', 'sleepSchedule': None, 'priorities': {'location': '1'}, 'genderInclusivePref': ['gender-inclusive']},
+        {'name': 'No Id', 'studentYear': 1, 'accessible': True, 'tidiness': 1.0},
+        {'userId': 42, 'name': 'Ünïcödé Nâme', 'dormArea': '', 'alcoholPref': None},
+    ]
+    table = ProfileTable(SIMULATED_PROFILES + odd_profiles)
+    positions = np.random.default_rng(5).integers(0, len(table), 200)
+    views = backend.ProfileRows(table, positions)
+    dicts = [view.to_dict() for view in views]
+
+    fields = list(backend.PROFILE_FIELDS) + ['priorities', 'notAField']
+    wrong_fields = [field for field in fields
+                    if table.column(positions, field, 'default') != [view.get(field, 'default') for view in views]]
+    traits_ok = (backend.encode_fallback_trait_array(views) == backend.encode_fallback_trait_array(dicts)).all()
+    flags_ok = all((a == b).all() for a, b in zip(backend.logistical_rule_flags(list(views)), backend.logistical_rule_flags(dicts)))
+    scores = np.arange(len(views)) % 40 + 60
+    entries_ok = backend.build_quick_match_results(views, scores) == [
+        backend.build_quick_match_result(profile, score) for profile, score in zip(dicts, scores.tolist())]
+
+    count = 50000
+    big_table = ProfileTable(make_applicant(i) for i in range(count))
+    big_views = backend.ProfileRows(big_table, np.arange(count))
+    start = time.perf_counter()
+    by_view = [[view.get(field, default) for _, field, default in backend.MATCH_CANDIDATE_FIELDS] for view in big_views]
+    view_ms = (time.perf_counter() - start) * 1000
+    start = time.perf_counter()
+    by_column = backend.match_candidate_columns(big_views)
+    column_ms = (time.perf_counter() - start) * 1000
+    same = [list(values) for values in zip(*by_column)] == by_view
+
+    print(f"   Fields read differently: {wrong_fields}, trait codes: {traits_ok}, rule flags: {flags_ok}, match entries: {entries_ok}")
+    print(f"   Match fields for {count:,} rows: {view_ms:.0f}ms through views, {column_ms:.0f}ms as columns")
+    if not wrong_fields and traits_ok and flags_ok and entries_ok and same and column_ms * 5 < view_ms:
+        print(f"   ✅ PASS: Columns read the same values, faster")
+        return True
+    print(f"   ❌ FAIL: Column reads differ from the views or are not faster")
+    return False
+
+
+def test_11_lazy_store_and_cache_recovery():
+    """Test that importing the module reads no workbook, and that a damaged cache is rebuilt instead of dropping the workbook"""
+    print("\n" + "="*60)
+    print("TEST 11: Lazy Store and Cache Recovery")
+    print("="*60)
+
+    row = ['xl_1', 'Riley', 'Central', 'double', 'upperclassman', 'night-owl', 'tidy', 'quiet', 'very-social', 1]
+    original_paths = backend.ROOMMATE_DATA_PATH, backend.ROOMMATE_DATA_CACHE_DIR
+    with tempfile.TemporaryDirectory() as tmp:
+        xlsx_path, cache_dir = os.path.join(tmp, 'applicants.xlsx'), os.path.join(tmp, 'cache')
+        write_workbook(xlsx_path, [row])
+
+        script = ("import os, HackUmass_back_end as b; print(os.path.exists(b.ROOMMATE_DATA_CACHE_DIR)); "
+                  "print(len(b.get_candidate_store()) - len(b.SIMULATED_PROFILES)); print(os.path.exists(b.ROOMMATE_DATA_CACHE_DIR))")
+        env = dict(os.environ, ROOMMATE_DATA_PATH=xlsx_path, ROOMMATE_DATA_CACHE_DIR=cache_dir)
+        output = subprocess.run([sys.executable, '-c', script], cwd=os.path.dirname(os.path.abspath(__file__)), env=env,
+                                capture_output=True, text=True).stdout.split()
+
+        backend.ROOMMATE_DATA_PATH, backend.ROOMMATE_DATA_CACHE_DIR = xlsx_path, cache_dir
+        try:
+            for path in glob.glob(os.path.join(cache_dir, 'profiles', '*.npy')):
+                os.remove(path)
+            recovered = backend.load_workbook_profiles()
+            os.utime(xlsx_path, (time.time() + 10, time.time() + 10))
+            touched = backend.load_workbook_profiles()
+        finally:
+            backend.ROOMMATE_DATA_PATH, backend.ROOMMATE_DATA_CACHE_DIR = original_paths
+        leftovers = [name for name in os.listdir(cache_dir) if name != 'manifest.json' and name.startswith('manifest')]
+        manifest = backend._read_manifest(cache_dir)
+
+    print(f"   Subprocess: cache dir after import {output[:1]}, workbook profiles {output[1:2]}, cache dir after first use {output[2:]}")
+    print(f"   Profiles after deleting the .npy files: {len(recovered)}, after a touch: {len(touched)}, leftover manifests: {leftovers}")
+    if (output == ['False', '1', 'True'] and [p['userId'] for p in recovered] == ['xl_1'] and len(touched) == 1
+            and not leftovers and manifest is not None):
+        print(f"   ✅ PASS: Store built on first use, damaged cache rebuilt, manifest replaced atomically")
+        return True
+    print(f"   ❌ FAIL: Workbook read at import or damaged cache not rebuilt")
+    return False
+
+
+# Run all tests
+if __name__ == "__main__":
+    print("\n" + "="*60)
+    print("CANDIDATE STORE TEST SUITE")
+    print("="*60)
+
+    tests = [
+        ("Indexed Lookup vs Linear Scan", test_1_matches_linear_scan),
+        ("Store Built Once", test_2_store_built_once),
+        ("Lookup Cost vs Population Size", test_3_lookup_scales_with_result_size),
+        ("Workbook Ingestion", test_4_workbook_ingestion),
+        ("Columnar Cache Reuse and Rebuild", test_5_cache_reuse_and_rebuild),
+        ("Shipped Roommate_data.xlsx", test_6_shipped_workbook),
+        ("Profile Views Round Trip", test_7_profile_views),
+        ("Per-Profile Memory", test_8_profile_memory),
+        ("Logistical Prefilter vs Final Filter", test_9_logistical_prefilter),
+        ("Column Reads vs Profile Views", test_10_column_reads),
+        ("Lazy Store and Cache Recovery", test_11_lazy_store_and_cache_recovery),
+    ]
+
+    results = []
+    for name, test_func in tests:
+        try:
+            result = test_func()
+            results.append((name, result))
+        except Exception as e:
+            print(f"\n   ❌ ERROR: {str(e)}")
+            import traceback
+            traceback.print_exc()
+            results.append((name, False))
+
+    # Summary
+    print("\n" + "="*60)
+    print("SUMMARY")
+    print("="*60)
+
+    passed = sum(1 for _, r in results if r)
+    total = len(results)
+
+    for name, result in results:
+        status = "✅ PASS" if result else "❌ FAIL"
+        print(f"{status} - {name}")
+
+    print(f"\nTotal: {passed}/{total} tests passed")
+    print("="*60 + "\n")
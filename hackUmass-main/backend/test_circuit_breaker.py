@@ -0,0 +1,257 @@
+#!/usr/bin/env python3
+"""
+Circuit breaker test suite - checks the breaker's states and that a Gemini outage stops costing request time
+"""
+
+import sys
+import os
+import time
+import contextvars
+sys.path.insert(0, os.path.dirname(__file__))
+
+import HackUmass_back_end as backend
+from fake_gemini import FakeGeminiConfig, start_fake_gemini
+from test_llm_scoring import USER, make_candidates
+
+
+class FakeClock:
+    def __init__(self):
+        self.now = 1000.0
+
+    def __call__(self):
+        return self.now
+
+
+def score_against(config, candidates, breaker):
+    """Scores candidates one request at a time against a stand-in. Returns (results, seconds per request, stand-in)."""
+    server, url = start_fake_gemini(config)
+    original = backend.API_URL, backend.LLM_SCORING_MODE, backend.get_score_cache(), backend.get_circuit_breaker()
+    backend.API_URL, backend.LLM_SCORING_MODE = url, "sequential"
+    backend.set_circuit_breaker(breaker)
+    try:
+        results, seconds = [], []
+        for candidate in candidates:
+            backend.set_score_cache(backend.ScoreCache(path=None))
+            start = time.perf_counter()
+            results += backend.score_top_candidates(USER, [candidate], 0)
+            seconds.append(time.perf_counter() - start)
+        return results, seconds, server.RequestHandlerClass.fake
+    finally:
+        backend.API_URL, backend.LLM_SCORING_MODE = original[0], original[1]
+        backend.set_score_cache(original[2])
+        backend.set_circuit_breaker(original[3])
+        server.shutdown()
+        server.server_close()
+
+
+def test_1_state_transitions():
+    """Test closed → open on the failure rate, half-open after the cooldown, and both probe outcomes"""
+    print("\n" + "="*60)
+    print("TEST 1: State Transitions")
+    print("="*60)
+
+    clock = FakeClock()
+    breaker = backend.CircuitBreaker(window=10, window_seconds=60, min_calls=4, failure_rate=0.5, cooldown=30, clock=clock)
+    states = []
+
+    for failed in (False, True, False, True):  # 2/4 failed: trips exactly at the threshold
+        assert breaker.allow()
+        breaker.record(failed)
+    states.append(breaker.state)
+    clock.now += 29
+    states.append((breaker.allow(), breaker.state))
+    clock.now += 1
+    states.append((breaker.allow(), breaker.allow(), breaker.state))  # One probe at a time
+    breaker.record(True)
+    states.append(breaker.state)
+    clock.now += 30
+    states.append(breaker.allow())
+    breaker.record(False)
+    states.append(breaker.state)
+    for failed in (True, True, True):  # Window was cleared on closing: 3 calls are below min_calls
+        breaker.allow()
+        breaker.record(failed)
+    states.append(breaker.state)
+    clock.now += 61  # Old failures age out of the window
+    breaker.allow()
+    breaker.record(True)
+    states.append(breaker.state)
+
+    stats = breaker.stats()
+    print(f"   States: {states}")
+    print(f"   Stats: { {k: v for k, v in stats.items() if k != 'recentTransitions'} }")
+    expected = ['open', (False, 'open'), (True, False, 'half_open'), 'open', True, 'closed', 'closed', 'closed']
+    if states == expected and stats['transitions'] == {'open': 2, 'half_open': 2, 'closed': 1} and stats['rejectedCalls'] == 2:
+        print(f"   ✅ PASS: Breaker followed closed → open → half-open → open → half-open → closed")
+        return True
+    print(f"   ❌ FAIL: Expected {expected}")
+    return False
+
+
+def test_2_outage_falls_back_fast():
+    """Test that during an outage only the first calls wait for the timeout and the rest fall back at once"""
+    print("\n" + "="*60)
+    print("TEST 2: Fast Fallback During an Outage")
+    print("="*60)
+
+    original_timeout = backend.INITIAL_TIMEOUT
+    backend.INITIAL_TIMEOUT = 0.3
+    try:
+        breaker = backend.CircuitBreaker(window=10, min_calls=3, failure_rate=0.5, cooldown=60)
+        config = FakeGeminiConfig(latency_ms=0, latency_dist='fixed', timeout_rate=1.0, hang_seconds=1.0)
+        results, seconds, fake = score_against(config, make_candidates(20), breaker)
+    finally:
+        backend.INITIAL_TIMEOUT = original_timeout
+
+    after_trip = seconds[3:]
+    print(f"   Requests reaching the stand-in: {fake.stats()['requests']}, breaker: {breaker.state}")
+    print(f"   First 3 requests: {[round(s, 2) for s in seconds[:3]]}s, slowest after the trip: {max(after_trip) * 1000:.2f} ms")
+    if (fake.stats()['requests'] == 3 and breaker.state == 'open' and max(after_trip) < 0.01
+            and all(r['error'] is not None for r in results)):
+        print(f"   ✅ PASS: 17 of 20 requests fell back without calling the API")
+        return True
+    print(f"   ❌ FAIL: Calls kept going to the failing API")
+    return False
+
+
+def test_3_recovery():
+    """Test that a probe after the cooldown closes the breaker once the API is healthy again"""
+    print("\n" + "="*60)
+    print("TEST 3: Recovery")
+    print("="*60)
+
+    clock = FakeClock()
+    breaker = backend.CircuitBreaker(min_calls=2, failure_rate=0.5, cooldown=30, clock=clock)
+    for _ in range(2):
+        breaker.allow()
+        breaker.record(True)
+    healthy = FakeGeminiConfig(latency_ms=0, latency_dist='fixed', seed=1)
+    during, _, _ = score_against(healthy, make_candidates(2), breaker)
+    clock.now += 30
+    after, _, fake = score_against(healthy, make_candidates(3), breaker)
+
+    print(f"   While open: {[r['error'] is not None for r in during]} fell back; after cooldown: {[r['error'] is not None for r in after]}")
+    print(f"   Breaker: {breaker.state}, stand-in requests after cooldown: {fake.stats()['requests']}")
+    if all(r['error'] is not None for r in during) and not any(r['error'] for r in after) and breaker.state == 'closed':
+        print(f"   ✅ PASS: Breaker closed and API scores came back")
+        return True
+    print(f"   ❌ FAIL: Breaker did not recover")
+    return False
+
+
+def test_4_observable_state():
+    """Test that the breaker's state and transitions are exported as metrics"""
+    print("\n" + "="*60)
+    print("TEST 4: Breaker Metrics")
+    print("="*60)
+
+    original = backend.get_circuit_breaker()
+    breaker = backend.CircuitBreaker(min_calls=1, cooldown=60)
+    backend.set_circuit_breaker(breaker)
+    try:
+        breaker.allow()
+        breaker.record(True)
+        rejected = backend.get_pipeline_metrics().stats()['counters']['circuit_rejections']
+        try:
+            backend.make_api_call({"contents": [{"parts": [{"text": "x"}]}]}, backend.MATCH_SCHEMA, "", "http://127.0.0.1:9/x")
+            raised = None
+        except backend.CircuitOpenError as e:
+            raised = e
+        rejected = backend.get_pipeline_metrics().stats()['counters']['circuit_rejections'] - rejected
+        text = backend.get_pipeline_metrics().render_prometheus()
+    finally:
+        backend.set_circuit_breaker(original)
+
+    lines = [line for line in text.splitlines() if 'circuit' in line and not line.startswith('#')]
+    print("   " + "\n   ".join(lines))
+    if (raised is not None and rejected == 1 and 'umatch_circuit_state{state="open"} 1' in lines
+            and 'umatch_circuit_transitions_total{to="open"} 1' in lines):
+        print(f"   ✅ PASS: State, transitions and rejections exported")
+        return True
+    print(f"   ❌ FAIL: Metrics missing (raised: {raised!r})")
+    return False
+
+
+def test_5_outage_under_request_deadline():
+    """Test that calls cut off by the request deadline during an outage still open the breaker"""
+    print("\n" + "="*60)
+    print("TEST 5: Outage Under the Request Deadline")
+    print("="*60)
+
+    user = next(p for p in backend.SIMULATED_PROFILES if p['userId'] == 'candidate_3')
+    breaker = backend.CircuitBreaker(window=10, min_calls=2, failure_rate=0.5, cooldown=60)
+    server, url = start_fake_gemini(FakeGeminiConfig(latency_ms=0, latency_dist='fixed', timeout_rate=1.0, hang_seconds=3.0))
+    original = backend.API_URL, backend.LLM_SCORING_MODE, backend.get_score_cache(), backend.get_circuit_breaker()
+    backend.API_URL, backend.LLM_SCORING_MODE = url, "concurrent"
+    backend.set_score_cache(backend.ScoreCache(path=None))
+    backend.set_circuit_breaker(breaker)
+
+    def request():
+        backend.set_deadline(1.5)
+        start = time.perf_counter()
+        result = backend.score_and_rank_matches(user, user['userId'])
+        return result, time.perf_counter() - start
+
+    try:
+        runs = []
+        for _ in range(3):
+            runs.append(contextvars.copy_context().run(request))
+            time.sleep(0.2)  # Lets the cut-off calls record their outcome, as the gap between real requests would
+    finally:
+        backend.API_URL, backend.LLM_SCORING_MODE = original[0], original[1]
+        backend.set_score_cache(original[2])
+        backend.set_circuit_breaker(original[3])
+        server.shutdown()
+        server.server_close()
+
+    calls = server.RequestHandlerClass.fake.stats()['requests']
+    reasons = [sorted({d['reason'] for d in result['degraded_candidates']}) for result, _ in runs]
+    print(f"   Request times: {[round(seconds, 2) for _, seconds in runs]}s, degraded reasons: {reasons}")
+    print(f"   Calls reaching the stand-in: {calls}, breaker: {breaker.state}")
+    if (breaker.state == 'open' and runs[0][1] < 2.0 and max(seconds for _, seconds in runs[1:]) < 0.5
+            and reasons[0] == ['request deadline'] and reasons[1:] == [['API unavailable']] * 2 and calls == len(runs[0][0]['degraded_candidates'])):
+        print(f"   ✅ PASS: The first request's cut-off calls opened the breaker; later requests skipped the API")
+        return True
+    print(f"   ❌ FAIL: Deadline cut-offs did not reach the breaker")
+    return False
+
+
+# Run all tests
+if __name__ == "__main__":
+    print("\n" + "="*60)
+    print("CIRCUIT BREAKER TEST SUITE")
+    print("="*60)
+
+    tests = [
+        ("State Transitions", test_1_state_transitions),
+        ("Fast Fallback During an Outage", test_2_outage_falls_back_fast),
+        ("Recovery", test_3_recovery),
+        ("Breaker Metrics", test_4_observable_state),
+        ("Outage Under the Request Deadline", test_5_outage_under_request_deadline),
+    ]
+
+    results = []
+    for name, test_func in tests:
+        try:
+            result = test_func()
+            results.append((name, result))
+        except Exception as e:
+            print(f"\n   ❌ ERROR: {str(e)}")
+            import traceback
+            traceback.print_exc()
+            results.append((name, False))
+
+    # Summary
+    print("\n" + "="*60)
+    print("SUMMARY")
+    print("="*60)
+
+    passed = sum(1 for _, r in results if r)
+    total = len(results)
+
+    for name, result in results:
+        status = "✅ PASS" if result else "❌ FAIL"
+        print(f"{status} - {name}")
+
+    print(f"\nTotal: {passed}/{total} tests passed")
+    print("="*60 + "\n")
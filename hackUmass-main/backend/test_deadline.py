@@ -0,0 +1,186 @@
+#!/usr/bin/env python3
+"""
+Request deadline test suite - checks that slow Gemini calls are cut off at the deadline and reported as degraded
+"""
+
+import sys
+import os
+import time
+import asyncio
+import contextvars
+sys.path.insert(0, os.path.dirname(__file__))
+
+import HackUmass_back_end as backend
+import main
+from fake_gemini import FakeGeminiConfig, start_fake_gemini
+from test_llm_scoring import USER, make_candidates
+
+DEADLINE = 0.8
+SLOW = FakeGeminiConfig(latency_ms=3000, latency_dist='fixed', seed=1)
+
+
+def run_with_deadline(seconds, fn, *args):
+    """Runs fn in a fresh context with a deadline `seconds` from now. Returns (result, elapsed seconds)."""
+    def run():
+        backend.set_deadline(seconds)
+        start = time.perf_counter()
+        result = fn(*args)
+        return result, time.perf_counter() - start
+    return contextvars.copy_context().run(run)
+
+
+def with_fake(config, mode, fn, *args, batch_size=None, module=backend):
+    """Runs fn with the module's API_URL pointed at a stand-in, a fresh memory-only cache and a fresh circuit breaker."""
+    server, url = start_fake_gemini(config)
+    original = (module.API_URL, module.LLM_SCORING_MODE, module.LLM_BATCH_SIZE, module.get_score_cache(),
+                module.get_circuit_breaker())
+    breaker = module.CircuitBreaker(min_calls=1)
+    module.API_URL, module.LLM_SCORING_MODE = url, mode
+    module.LLM_BATCH_SIZE = batch_size or module.LLM_BATCH_SIZE
+    module.set_score_cache(module.ScoreCache(path=None))
+    module.set_circuit_breaker(breaker)
+    try:
+        return fn(*args), breaker
+    finally:
+        module.API_URL, module.LLM_SCORING_MODE, module.LLM_BATCH_SIZE = original[:3]
+        module.set_score_cache(original[3])
+        module.set_circuit_breaker(original[4])
+        server.shutdown()
+        server.server_close()
+
+
+def test_1_slow_calls_cut_at_deadline():
+    """Test that concurrent and batched scoring return at the deadline with fallback scores, without tripping the breaker"""
+    print("\n" + "="*60)
+    print("TEST 1: Slow Calls Cut Off at the Deadline")
+    print("="*60)
+
+    metrics = backend.get_pipeline_metrics()
+    candidates = make_candidates(6)
+    failures = []
+    for mode in ("concurrent", "batched"):
+        before = metrics.stats()['counters']['deadline_fallbacks']
+        (results, elapsed), breaker = with_fake(SLOW, mode, run_with_deadline, DEADLINE, backend.score_top_candidates,
+                                                USER, candidates, 0, batch_size=2)
+        counted = metrics.stats()['counters']['deadline_fallbacks'] - before
+        reasons = {r.get('degradedReason') for r in results}
+        print(f"   {mode}: {len(results)} results in {elapsed:.2f}s, reasons {reasons}, counted {counted}, breaker {breaker.state}")
+        if not (len(results) == 6 and elapsed < DEADLINE + 0.3 and reasons == {"request deadline"} and counted == 6
+                and breaker.state == "closed" and breaker.stats()['recentCalls'] == 0):
+            failures.append(mode)
+
+    if not failures:
+        print(f"   ✅ PASS: Every candidate fell back at the deadline; the breaker saw no failures")
+        return True
+    print(f"   ❌ FAIL: {failures}")
+    return False
+
+
+def test_2_partial_results_kept():
+    """Test that calls finishing inside the budget keep their API score and only the rest are degraded"""
+    print("\n" + "="*60)
+    print("TEST 2: Partial Results Within the Budget")
+    print("="*60)
+
+    config = FakeGeminiConfig(latency_ms=250, latency_dist='fixed', seed=1)
+    (results, elapsed), _ = with_fake(config, "sequential", run_with_deadline, 1.0, backend.score_top_candidates,
+                                      USER, make_candidates(8), 0)
+
+    scored = [r['candidateName'] for r in results if r.get('degradedReason') is None]
+    degraded = [r['candidateName'] for r in results if r.get('degradedReason') == "request deadline"]
+    print(f"   {len(scored)} API-scored, {len(degraded)} degraded in {elapsed:.2f}s")
+    if 2 <= len(scored) <= 4 and len(scored) + len(degraded) == 8 and elapsed < 1.2:
+        print(f"   ✅ PASS: Early candidates kept their API scores, the rest skipped the API")
+        return True
+    print(f"   ❌ FAIL: Expected a few API scores and the remaining candidates degraded")
+    return False
+
+
+def test_3_no_deadline_waits():
+    """Test that without a deadline (REQUEST_DEADLINE=0) calls are waited for as before"""
+    print("\n" + "="*60)
+    print("TEST 3: Deadline Disabled")
+    print("="*60)
+
+    config = FakeGeminiConfig(latency_ms=1000, latency_dist='fixed', seed=1)
+    (results, elapsed), _ = with_fake(config, "concurrent", run_with_deadline, 0, backend.score_top_candidates,
+                                      USER, make_candidates(3), 0)
+
+    print(f"   {len(results)} results in {elapsed:.2f}s, errors: {[r['error'] for r in results]}")
+    if len(results) == 3 and all(r['error'] is None for r in results) and elapsed >= 1.0:
+        print(f"   ✅ PASS: Every call was waited for")
+        return True
+    print(f"   ❌ FAIL: Calls were cut off without a deadline")
+    return False
+
+
+def test_4_response_reports_degraded():
+    """Test that /api/match answers within the deadline and lists the degraded candidates"""
+    print("\n" + "="*60)
+    print("TEST 4: Degraded Candidates in the Response")
+    print("="*60)
+
+    profile = main.UserProfile(userId='deadline_user', roomType='double', genderType='coed', communityType='academic-focused',
+                               yearStatus='upperclassman', sleepSchedule='early-bird', tidinessLevel='very-tidy', major='History')
+    original_deadline = main.hackumass_backend.REQUEST_DEADLINE
+    main.hackumass_backend.REQUEST_DEADLINE = DEADLINE
+    try:
+        def request():
+            start = time.perf_counter()
+            response = asyncio.run(main.get_matches(profile))
+            return response, time.perf_counter() - start
+        (response, elapsed), _ = with_fake(SLOW, "concurrent", request, module=main.hackumass_backend)
+    finally:
+        main.hackumass_backend.REQUEST_DEADLINE = original_deadline
+
+    degraded = response.degraded_candidates
+    flagged = [m['candidateName'] for m in response.ranked_matches if m['degraded']]
+    print(f"   Answered in {elapsed:.2f}s with {len(response.ranked_matches)} matches")
+    print(f"   Degraded: {[(d['candidateName'], d['reason']) for d in degraded]}, flagged in ranking: {flagged}")
+    degraded_names = {d['candidateName'] for d in degraded}
+    if (degraded and elapsed < DEADLINE + 0.5 and all(d['reason'] == "request deadline" and d['userId'] for d in degraded)
+            and set(flagged) <= degraded_names):
+        print(f"   ✅ PASS: Response arrived on time and says which candidates fell back")
+        return True
+    print(f"   ❌ FAIL: Response late or degraded candidates not reported")
+    return False
+
+
+# Run all tests
+if __name__ == "__main__":
+    print("\n" + "="*60)
+    print("REQUEST DEADLINE TEST SUITE")
+    print("="*60)
+
+    tests = [
+        ("Slow Calls Cut Off", test_1_slow_calls_cut_at_deadline),
+        ("Partial Results", test_2_partial_results_kept),
+        ("Deadline Disabled", test_3_no_deadline_waits),
+        ("Degraded Candidates in the Response", test_4_response_reports_degraded),
+    ]
+
+    results = []
+    for name, test_func in tests:
+        try:
+            result = test_func()
+            results.append((name, result))
+        except Exception as e:
+            print(f"\n   ❌ ERROR: {str(e)}")
+            import traceback
+            traceback.print_exc()
+            results.append((name, False))
+
+    # Summary
+    print("\n" + "="*60)
+    print("SUMMARY")
+    print("="*60)
+
+    passed = sum(1 for _, r in results if r)
+    total = len(results)
+
+    for name, result in results:
+        status = "✅ PASS" if result else "❌ FAIL"
+        print(f"{status} - {name}")
+
+    print(f"\nTotal: {passed}/{total} tests passed")
+    print("="*60 + "\n")
@@ -0,0 +1,187 @@
+#!/usr/bin/env python3
+"""
+Gemini stand-in test suite - runs the real HTTP scoring path against fake_gemini.py (no network, no quota)
+"""
+
+import sys
+import os
+import json
+import time
+import urllib.request
+sys.path.insert(0, os.path.dirname(__file__))
+
+import HackUmass_back_end as backend
+from fake_gemini import FakeGeminiConfig, start_fake_gemini
+from test_llm_scoring import USER, make_candidates
+
+INSTANT = FakeGeminiConfig(latency_ms=0, latency_dist='fixed', seed=1)
+
+
+def call_fake(config, prompt="score", schema=backend.MATCH_SCHEMA):
+    """make_api_call against a fresh stand-in (and circuit breaker). Returns (result or exception, stand-in /stats)."""
+    server, url = start_fake_gemini(config)
+    original_breaker = backend.get_circuit_breaker()
+    backend.set_circuit_breaker(backend.CircuitBreaker())
+    try:
+        try:
+            result = backend.make_api_call({"contents": [{"parts": [{"text": prompt}]}]}, schema,
+                                           backend.LLM_SYSTEM_INSTRUCTION, url, is_scoring=True)
+        except Exception as e:
+            result = e
+        stats_url = url.split('/v1beta')[0] + '/stats'
+        with urllib.request.urlopen(stats_url) as response:
+            return result, json.loads(response.read())
+    finally:
+        backend.set_circuit_breaker(original_breaker)
+        server.shutdown()
+        server.server_close()
+
+
+def score_through_fake(config, mode, candidates, breaker=None):
+    """score_top_candidates with API_URL pointed at a stand-in, a fresh memory-only cache and a fresh circuit breaker."""
+    server, url = start_fake_gemini(config)
+    original_url, original_mode, original_cache = backend.API_URL, backend.LLM_SCORING_MODE, backend.get_score_cache()
+    original_breaker = backend.get_circuit_breaker()
+    backend.API_URL, backend.LLM_SCORING_MODE = url, mode
+    backend.set_score_cache(backend.ScoreCache(path=None))
+    backend.set_circuit_breaker(breaker or backend.CircuitBreaker())
+    try:
+        return backend.score_top_candidates(USER, candidates, 0)
+    finally:
+        backend.API_URL, backend.LLM_SCORING_MODE = original_url, original_mode
+        backend.set_score_cache(original_cache)
+        backend.set_circuit_breaker(original_breaker)
+        server.shutdown()
+        server.server_close()
+
+
+def test_1_schema_valid_scores():
+    """Test that the stand-in answers MATCH_SCHEMA with valid, prompt-deterministic JSON"""
+    print("\n" + "="*60)
+    print("TEST 1: Schema-Valid Match Responses")
+    print("="*60)
+
+    first, stats = call_fake(INSTANT, "profile pair A")
+    again, _ = call_fake(INSTANT, "profile pair A")
+    other, _ = call_fake(INSTANT, "profile pair B")
+
+    print(f"   Result: {first}")
+    print(f"   Stand-in stats: {stats}")
+    fields_ok = isinstance(first, dict) and set(first) == set(backend.MATCH_SCHEMA['properties'])
+    if (fields_ok and isinstance(first['compatibilityScore'], int) and 40 <= first['compatibilityScore'] <= 100
+            and first['confidenceLevel'] in ('High', 'Medium', 'Low') and first == again and first != other
+            and stats['ok'] == 1):
+        print(f"   ✅ PASS: Every schema field present, same prompt gives the same answer")
+        return True
+    print(f"   ❌ FAIL: Response does not fit MATCH_SCHEMA")
+    return False
+
+
+def test_2_batched_scoring():
+    """Test that batched scoring gets one entry per candidate back from the stand-in"""
+    print("\n" + "="*60)
+    print("TEST 2: Batched Scoring Through the Stand-In")
+    print("="*60)
+
+    candidates = make_candidates(7)
+    results = score_through_fake(INSTANT, "batched", candidates)
+
+    summary = [(r['candidateName'], r['compatibilityScore'], r['error'] is not None) for r in results]
+    print(f"   Results: {summary}")
+    if len(results) == 7 and all(r['error'] is None for r in results):
+        print(f"   ✅ PASS: Every candidate scored by the stand-in, none fell back")
+        return True
+    print(f"   ❌ FAIL: Candidates fell back or went missing")
+    return False
+
+
+def test_3_injected_failures():
+    """Test that 429s, 500s, malformed JSON and hangs surface as the errors make_api_call raises"""
+    print("\n" + "="*60)
+    print("TEST 3: Injected Failures")
+    print("="*60)
+
+    original_timeout = backend.INITIAL_TIMEOUT
+    backend.INITIAL_TIMEOUT = 0.3
+    metrics = backend.get_pipeline_metrics()
+    timeouts_before = metrics.stats()['counters']['api_timeouts']
+    try:
+        outcomes = {
+            'rate_limited': call_fake(INSTANT._replace(rate_limit_rate=1.0)),
+            'server_error': call_fake(INSTANT._replace(error_rate=1.0)),
+            'malformed': call_fake(INSTANT._replace(malformed_rate=1.0)),
+            'timeout': call_fake(INSTANT._replace(timeout_rate=1.0, hang_seconds=1.0)),
+        }
+    finally:
+        backend.INITIAL_TIMEOUT = original_timeout
+    timeouts = metrics.stats()['counters']['api_timeouts'] - timeouts_before
+
+    expected = {'rate_limited': ConnectionError, 'server_error': ConnectionError, 'malformed': ValueError, 'timeout': ConnectionError}
+    for name, (result, stats) in outcomes.items():
+        print(f"   {name}: {type(result).__name__}: {result} (served: {stats[name]})")
+    if all(isinstance(outcomes[name][0], error) and outcomes[name][1][name] == 1 for name, error in expected.items()) and timeouts == 1:
+        print(f"   ✅ PASS: Each failure raised the expected error and the timeout was counted")
+        return True
+    print(f"   ❌ FAIL: Wrong errors (timeouts counted: {timeouts})")
+    return False
+
+
+def test_4_fallback_under_failures():
+    """Test that concurrent scoring falls back for failed calls and keeps the stand-in's scores for the rest"""
+    print("\n" + "="*60)
+    print("TEST 4: Fallback Under a 50% Failure Rate")
+    print("="*60)
+
+    config = FakeGeminiConfig(latency_ms=50, latency_dist='uniform', latency_spread=40, error_rate=0.3, malformed_rate=0.2, seed=7)
+    candidates = make_candidates(10)
+    start = time.perf_counter()
+    results = score_through_fake(config, "concurrent", candidates, backend.CircuitBreaker(failure_rate=1.1))
+    elapsed = time.perf_counter() - start
+
+    fell_back = sum(1 for r in results if r['error'] is not None)
+    print(f"   {len(results)} results, {fell_back} fallbacks in {elapsed:.2f}s")
+    if len(results) == 10 and 0 < fell_back < 10:
+        print(f"   ✅ PASS: Failed calls fell back, the rest kept their API scores")
+        return True
+    print(f"   ❌ FAIL: Expected a mix of API and fallback scores")
+    return False
+
+
+# Run all tests
+if __name__ == "__main__":
+    print("\n" + "="*60)
+    print("GEMINI STAND-IN TEST SUITE")
+    print("="*60)
+
+    tests = [
+        ("Schema-Valid Responses", test_1_schema_valid_scores),
+        ("Batched Scoring", test_2_batched_scoring),
+        ("Injected Failures", test_3_injected_failures),
+        ("Fallback Under Failures", test_4_fallback_under_failures),
+    ]
+
+    results = []
+    for name, test_func in tests:
+        try:
+            result = test_func()
+            results.append((name, result))
+        except Exception as e:
+            print(f"\n   ❌ ERROR: {str(e)}")
+            import traceback
+            traceback.print_exc()
+            results.append((name, False))
+
+    # Summary
+    print("\n" + "="*60)
+    print("SUMMARY")
+    print("="*60)
+
+    passed = sum(1 for _, r in results if r)
+    total = len(results)
+
+    for name, result in results:
+        status = "✅ PASS" if result else "❌ FAIL"
+        print(f"{status} - {name}")
+
+    print(f"\nTotal: {passed}/{total} tests passed")
+    print("="*60 + "\n")
@@ -0,0 +1,201 @@
+#!/usr/bin/env python3
+"""
+Group formation test suite - checks form_room_group against the matching rules and a brute-force optimum
+"""
+
+import sys
+import os
+import time
+from itertools import combinations
+import numpy as np
+sys.path.insert(0, os.path.dirname(__file__))
+
+import HackUmass_back_end as backend
+from test_assignment import make_population
+
+MIN_SCORE = backend.get_min_compatibility_threshold('triple')
+
+
+def roommate_score(profile_a, profile_b):
+    """What form_room_group may put these two roommates together at, or 0 if it must not (areas checked separately)."""
+    for user, candidate in ((profile_a, profile_b), (profile_b, profile_a)):
+        if not backend.final_logistical_filter(user, [dict(candidate, candidateDorm=candidate['dormArea'])]):
+            return 0
+    score = min(backend.calculate_fallback_score(profile_a, profile_b), backend.calculate_fallback_score(profile_b, profile_a))
+    return score if score >= MIN_SCORE else 0
+
+
+def make_matches(count, seed=1, areas=backend.QUAD_ROOM_AREAS):
+    """A user and `count` match entries for them, scored the way the fallback path scores them."""
+    profiles = make_population(count + 1, seed, areas=areas, double_share=1.0)
+    user, candidates = profiles[0], profiles[1:]
+    return user, [backend.build_fallback_match_result(user, candidate, 'a test', '', None) for candidate in candidates]
+
+
+def best_group(matches, size, areas):
+    """(total, area) of the best full group by exhaustive search, or (-1, None) without one."""
+    best = (-1, None)
+    for area in areas:
+        pool = [m for m in matches if m['candidateDorm'] == area]
+        for group in combinations(pool, size):
+            pairs = [roommate_score(a['candidateProfile'], b['candidateProfile']) for a, b in combinations(group, 2)]
+            if all(pairs):
+                best = max(best, (sum(m['compatibilityScore'] for m in group) + sum(pairs), area))
+    return best
+
+
+def test_1_groups_follow_matching_rules():
+    """Test that every group shares one area and hall and every two roommates are compatible"""
+    print("\n" + "="*60)
+    print("TEST 1: Groups Follow the Matching Rules")
+    print("="*60)
+
+    bad_seeds = []
+    for seed in range(50):
+        user, matches = make_matches(60, seed)
+        group = backend.form_room_group(user, matches, 3, backend.QUAD_ROOM_AREAS, min_score=MIN_SCORE)
+        pairs = [roommate_score(a['candidateProfile'], b['candidateProfile']) for a, b in combinations(group.matches, 2)]
+        halls = backend.RESIDENTIAL_AREA_TO_HALLS.get(group.area, [])
+        if (len(group.matches) != 3 or not all(pairs) or {m['candidateDorm'] for m in group.matches} != {group.area}
+                or group.hall != halls[0]
+                or group.min_pairwise_score != min(pairs + [m['compatibilityScore'] for m in group.matches])):
+            bad_seeds.append(seed)
+
+    if not bad_seeds:
+        print(f"   ✅ PASS: 50 quads, each in one hall with every pair compatible")
+        return True
+    print(f"   ❌ FAIL: Seeds {bad_seeds}")
+    return False
+
+
+def test_2_matches_brute_force():
+    """Test that the chosen group has the highest total an exhaustive search finds"""
+    print("\n" + "="*60)
+    print("TEST 2: Group Formation vs Brute-Force Optimum")
+    print("="*60)
+
+    wrong = []
+    for seed in range(100):
+        user, matches = make_matches(14, seed, areas=['Central', 'Southwest'])
+        size = 2 + seed % 2
+        group = backend.form_room_group(user, matches, size, ['Central', 'Southwest'], min_score=MIN_SCORE)
+        optimum, _ = best_group(matches, size, ['Central', 'Southwest'])
+        if (group.total_score if len(group.matches) == size else -1) != optimum:
+            wrong.append(seed)
+
+    print(f"   100 pools of 14: {len(wrong)} groups off the optimum")
+    if not wrong:
+        print(f"   ✅ PASS: Every group optimal")
+        return True
+    print(f"   ❌ FAIL: Seeds {wrong}")
+    return False
+
+
+def test_3_preferred_area_wins():
+    """Test that a full group in the preferred area is chosen over a better one elsewhere"""
+    print("\n" + "="*60)
+    print("TEST 3: Preferred Area")
+    print("="*60)
+
+    user, matches = make_matches(60, seed=7, areas=['Central', 'Southwest'])
+    groups = {area: backend.form_room_group(user, matches, 3, ['Central', 'Southwest'], area, MIN_SCORE)
+              for area in ('Central', 'Southwest')}
+    if all(group.area == area for area, group in groups.items()):
+        print(f"   ✅ PASS: Central → {groups['Central'].hall}, Southwest → {groups['Southwest'].hall}")
+        return True
+    print(f"   ❌ FAIL: {[(area, group.area) for area, group in groups.items()]}")
+    return False
+
+
+def test_4_scales_to_large_pools():
+    """Test that a quad is formed from 5,000 matches in well under a request's time budget"""
+    print("\n" + "="*60)
+    print("TEST 4: 5,000 Matches")
+    print("="*60)
+
+    user, matches = make_matches(5000, seed=3)
+    start = time.perf_counter()
+    group = backend.form_room_group(user, matches, 3, backend.QUAD_ROOM_AREAS, min_score=MIN_SCORE)
+    elapsed = time.perf_counter() - start
+
+    print(f"   {group.area} / {group.hall}: total {group.total_score}, min pair {group.min_pairwise_score} in {elapsed:.2f}s")
+    if len(group.matches) == 3 and elapsed < 2:
+        print(f"   ✅ PASS: Full quad formed in time")
+        return True
+    print(f"   ❌ FAIL: Too slow or no full group")
+    return False
+
+
+def test_5_store_candidates_at_100k():
+    """Test that a quad is formed from 100,000 store candidates within a request's time budget, as from plain dicts"""
+    print("\n" + "="*60)
+    print("TEST 5: 100,000 Store Candidates")
+    print("="*60)
+
+    count = 100000
+    profiles = make_population(count + 1, seed=11, areas=backend.QUAD_ROOM_AREAS, double_share=1.0)
+    user = profiles[0]
+    store = backend.CandidateStore(profiles[1:])
+    scores = backend.batch_fallback_scores(user, store.trait_codes)
+    views = backend.ProfileRows(store.profiles, np.arange(count))
+    matches = backend.build_quick_match_results(views, scores)
+
+    start = time.perf_counter()
+    group = backend.form_room_group(user, matches, 3, backend.QUAD_ROOM_AREAS, min_score=MIN_SCORE)
+    elapsed = time.perf_counter() - start
+
+    # The per-row path (plain dict profiles) must choose the same group
+    dict_matches = [dict(match, candidateProfile=profiles[k + 1]) for k, match in enumerate(matches)]
+    expected = backend.form_room_group(user, dict_matches, 3, backend.QUAD_ROOM_AREAS, min_score=MIN_SCORE)
+    pairs = [roommate_score(dict(a['candidateProfile']), dict(b['candidateProfile'])) for a, b in combinations(group.matches, 2)]
+    same = ([m['candidateName'] for m in group.matches] == [m['candidateName'] for m in expected.matches]
+            and group.total_score == expected.total_score)
+
+    print(f"   {group.area} / {group.hall}: total {group.total_score}, min pair {group.min_pairwise_score} in {elapsed:.2f}s")
+    print(f"   Same group as from plain dicts: {same}")
+    if len(group.matches) == 3 and all(pairs) and same and elapsed < 1:
+        print(f"   ✅ PASS: Full quad formed in time")
+        return True
+    print(f"   ❌ FAIL: Too slow, no full group, or a different group than the per-row path")
+    return False
+
+
+# Run all tests
+if __name__ == "__main__":
+    print("\n" + "="*60)
+    print("GROUP FORMATION TEST SUITE")
+    print("="*60)
+
+    tests = [
+        ("Matching Rules", test_1_groups_follow_matching_rules),
+        ("Brute-Force Optimum", test_2_matches_brute_force),
+        ("Preferred Area", test_3_preferred_area_wins),
+        ("5,000 Matches", test_4_scales_to_large_pools),
+        ("100,000 Store Candidates", test_5_store_candidates_at_100k),
+    ]
+
+    results = []
+    for name, test_func in tests:
+        try:
+            result = test_func()
+            results.append((name, result))
+        except Exception as e:
+            print(f"\n   ❌ ERROR: {str(e)}")
+            import traceback
+            traceback.print_exc()
+            results.append((name, False))
+
+    # Summary
+    print("\n" + "="*60)
+    print("SUMMARY")
+    print("="*60)
+
+    passed = sum(1 for _, r in results if r)
+    total = len(results)
+
+    for name, result in results:
+        status = "✅ PASS" if result else "❌ FAIL"
+        print(f"{status} - {name}")
+
+    print(f"\nTotal: {passed}/{total} tests passed")
+    print("="*60 + "\n")
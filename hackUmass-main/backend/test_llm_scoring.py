@@ -0,0 +1,515 @@
+#!/usr/bin/env python3
+"""
+LLM scoring test suite - tests how API scoring calls are issued, using a stubbed API (no network)
+"""
+
+import sys
+import os
+import time
+import json
+import tempfile
+import threading
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+sys.path.insert(0, os.path.dirname(__file__))
+
+import HackUmass_back_end as backend
+
+API_DELAY = 0.3
+
+USER = {
+    'userId': 'test', 'name': 'Test User', 'major': 'Computer Science', 'studentYear': 'upperclassmen',
+    'sleepSchedule': 'balanced', 'tidiness': 'tidy', 'noiseLevel': 'quiet', 'socialLevel': 'moderately-social',
+}
+
+
+def make_candidates(count):
+    # sharedInterests reaches the prompt (names do not), so the stubs can tell candidates apart
+    return [dict(USER, userId=f"candidate_{i}", name=f"Candidate {i}", dormArea='Central', sharedInterests=f"Candidate {i}")
+            for i in range(count)]
+
+
+class StubAPI:
+    """Stands in for make_api_call: sleeps like a slow API and scores by candidate number."""
+
+    def __init__(self, fail_names=()):
+        self.fail_names = set(fail_names)
+        self.in_flight = 0
+        self.max_in_flight = 0
+        self.calls = 0
+        self.prompt_bytes = 0
+        self.lock = threading.Lock()
+
+    def __call__(self, payload, schema, system_instruction, url, is_scoring=False):
+        with self.lock:
+            self.calls += 1
+            self.in_flight += 1
+            self.prompt_bytes += len(payload['contents'][0]['parts'][0]['text'].encode('utf-8')) + len(system_instruction.encode('utf-8'))
+            self.max_in_flight = max(self.max_in_flight, self.in_flight)
+        try:
+            time.sleep(API_DELAY)
+            text = payload['contents'][0]['parts'][0]['text']
+            for name in self.fail_names:
+                if name in text:
+                    raise ConnectionError("stubbed API failure")
+            number = int(text.split('"Candidate ')[1].split('"')[0])
+            return {'compatibilityScore': 90 - number, 'confidenceLevel': 'High',
+                    'reasoningSummary': 'stub', 'matchAdvice': 'stub'}
+        finally:
+            with self.lock:
+                self.in_flight -= 1
+
+
+class StubBatchAPI:
+    """Stands in for make_api_call in batched mode: answers every candidate in the prompt, in reverse order."""
+
+    def __init__(self, drop_ids=()):
+        self.drop_ids = set(drop_ids)
+        self.calls = 0
+        self.prompt_bytes = 0
+
+    def __call__(self, payload, schema, system_instruction, url, is_scoring=False):
+        self.calls += 1
+        text = payload['contents'][0]['parts'][0]['text']
+        self.prompt_bytes += len(text.encode('utf-8')) + len(system_instruction.encode('utf-8'))
+        ids = [part.split(')')[0] for part in text.split('(userId: ')[1:]]
+        matches = [{'userId': user_id, 'compatibilityScore': 90 - int(user_id.split('_')[1]), 'confidenceLevel': 'High',
+                    'reasoningSummary': 'stub', 'matchAdvice': 'stub'} for user_id in ids if user_id not in self.drop_ids]
+        return {'matches': list(reversed(matches))}
+
+
+class PromptRecorder:
+    """Stands in for make_api_call and keeps every prompt it was sent."""
+
+    def __init__(self):
+        self.prompts = []
+
+    def __call__(self, payload, schema, system_instruction, url, is_scoring=False):
+        self.prompts.append(payload['contents'][0]['parts'][0]['text'])
+        return {'compatibilityScore': 85, 'confidenceLevel': 'High', 'reasoningSummary': 'ok', 'matchAdvice': 'ok'}
+
+
+def run_scoring(stub, mode, candidates, cache=None):
+    """Scores candidates with the stubbed API, using a fresh memory-only cache unless one is given."""
+    original_call, original_mode, original_cache = backend.make_api_call, backend.LLM_SCORING_MODE, backend.get_score_cache()
+    backend.make_api_call, backend.LLM_SCORING_MODE = stub, mode
+    backend.set_score_cache(cache or backend.ScoreCache(path=None))
+    try:
+        start = time.perf_counter()
+        results = backend.score_top_candidates(USER, candidates, 75)
+        return results, time.perf_counter() - start
+    finally:
+        backend.make_api_call, backend.LLM_SCORING_MODE = original_call, original_mode
+        backend.set_score_cache(original_cache)
+
+
+def test_1_concurrent_latency():
+    """Test that concurrent scoring takes about one call, not the sum of all calls"""
+    print("\n" + "="*60)
+    print("TEST 1: Concurrent Scoring Latency")
+    print("="*60)
+
+    candidates = make_candidates(5)
+    _, sequential_time = run_scoring(StubAPI(), "sequential", candidates)
+    stub = StubAPI()
+    _, concurrent_time = run_scoring(stub, "concurrent", candidates)
+
+    print(f"   Sequential: {sequential_time:.2f}s, concurrent: {concurrent_time:.2f}s, max in flight: {stub.max_in_flight}")
+    if concurrent_time < API_DELAY * 2 and sequential_time >= API_DELAY * 5:
+        print(f"   ✅ PASS: Latency is the slowest call, not the sum")
+        return True
+    print(f"   ❌ FAIL: Calls were not issued concurrently")
+    return False
+
+
+def test_2_same_results_as_sequential():
+    """Test that concurrent mode returns the same matches in the same order"""
+    print("\n" + "="*60)
+    print("TEST 2: Concurrent Results vs Sequential Results")
+    print("="*60)
+
+    candidates = make_candidates(5)
+    sequential, _ = run_scoring(StubAPI(), "sequential", candidates)
+    concurrent, _ = run_scoring(StubAPI(), "concurrent", candidates)
+
+    summary = lambda results: [(r['candidateName'], r['compatibilityScore']) for r in results]
+    print(f"   Concurrent: {summary(concurrent)}")
+    if summary(sequential) == summary(concurrent) and len(concurrent) == 5:
+        print(f"   ✅ PASS: Identical results and order")
+        return True
+    print(f"   ❌ FAIL: Sequential gave {summary(sequential)}")
+    return False
+
+
+def test_3_per_candidate_fallback():
+    """Test that one failing call falls back without affecting the others"""
+    print("\n" + "="*60)
+    print("TEST 3: Per-Candidate Fallback")
+    print("="*60)
+
+    candidates = make_candidates(5)
+    results, _ = run_scoring(StubAPI(fail_names=['Candidate 2']), "concurrent", candidates)
+    errors = {r['candidateName']: r['error'] for r in results}
+    print(f"   Errors: {errors}")
+
+    if len(results) == 5 and errors['Candidate 2'] and all(errors[n] is None for n in errors if n != 'Candidate 2'):
+        print(f"   ✅ PASS: Only the failed candidate used fallback scoring")
+        return True
+    print(f"   ❌ FAIL: Fallback did not stay per-candidate")
+    return False
+
+
+def test_4_concurrency_limit():
+    """Test that the pool never runs more calls than LLM_MAX_CONCURRENCY"""
+    print("\n" + "="*60)
+    print("TEST 4: Concurrency Limit")
+    print("="*60)
+
+    stub = StubAPI()
+    results, elapsed = run_scoring(stub, "concurrent", make_candidates(backend.LLM_MAX_CONCURRENCY * 2))
+    print(f"   {len(results)} calls, max in flight: {stub.max_in_flight}, took {elapsed:.2f}s")
+
+    if stub.max_in_flight <= backend.LLM_MAX_CONCURRENCY:
+        print(f"   ✅ PASS: At most {backend.LLM_MAX_CONCURRENCY} calls in flight")
+        return True
+    print(f"   ❌ FAIL: Concurrency limit exceeded")
+    return False
+
+
+def test_5_repeat_submission_cached():
+    """Test that resubmitting the same profile is answered from the cache"""
+    print("\n" + "="*60)
+    print("TEST 5: Repeat Submission Uses Score Cache")
+    print("="*60)
+
+    cache = backend.ScoreCache(path=None)
+    candidates = make_candidates(5)
+    stub = StubAPI()
+    first, _ = run_scoring(stub, "concurrent", candidates, cache)
+    calls_after_first = stub.calls
+    second, repeat_time = run_scoring(stub, "concurrent", candidates, cache)
+    stats = cache.stats()
+
+    print(f"   API calls: {calls_after_first} then {stub.calls - calls_after_first}, repeat took {repeat_time * 1000:.1f} ms")
+    print(f"   Cache stats: {stats}")
+    if stub.calls == 5 and repeat_time < 0.1 and first == second and stats['hits'] == 5:
+        print(f"   ✅ PASS: Repeat submission cost no API calls")
+        return True
+    print(f"   ❌ FAIL: Repeat submission was not served from the cache")
+    return False
+
+
+def test_6_disk_tier_and_ttl():
+    """Test that cached scores survive a restart and expire after the TTL"""
+    print("\n" + "="*60)
+    print("TEST 6: Disk Tier and TTL")
+    print("="*60)
+
+    with tempfile.TemporaryDirectory() as tmp:
+        path = os.path.join(tmp, "scores.sqlite3")
+        key = backend.make_score_cache_key(USER, make_candidates(1)[0], False, 75)
+        backend.ScoreCache(path).set(key, {'compatibilityScore': 88})
+
+        restarted = backend.ScoreCache(path)
+        survived = restarted.get(key)
+        expired_cache = backend.ScoreCache(path, ttl=-1)
+        expired_cache.set(key, {'compatibilityScore': 88})
+        expired = backend.ScoreCache(path).get(key)
+
+    print(f"   After restart: {survived}, disk hits: {restarted.stats()['diskHits']}")
+    print(f"   After TTL: {expired}")
+    if survived == {'compatibilityScore': 88} and restarted.stats()['diskHits'] == 1 and expired is None:
+        print(f"   ✅ PASS: Disk tier persists and expires entries")
+        return True
+    print(f"   ❌ FAIL: Disk tier or TTL not working")
+    return False
+
+
+def test_7_cache_key_fields():
+    """Test that the key ignores user IDs but changes with mode, threshold and traits"""
+    print("\n" + "="*60)
+    print("TEST 7: Score Cache Key")
+    print("="*60)
+
+    candidate = make_candidates(1)[0]
+    key = backend.make_score_cache_key(USER, candidate, False, 75)
+    checks = {
+        "same pair, new userId": backend.make_score_cache_key(dict(USER, userId='other'), candidate, False, 75) == key,
+        "alternative mode": backend.make_score_cache_key(USER, candidate, True, 75) != key,
+        "threshold": backend.make_score_cache_key(USER, candidate, False, 60) != key,
+        "trait change": backend.make_score_cache_key(dict(USER, tidiness='messy'), candidate, False, 75) != key,
+        "key order": backend.make_score_cache_key(dict(reversed(list(USER.items()))), candidate, False, 75) == key,
+    }
+
+    # Candidates whose priorities are blank, missing or only in the priorities dict: same key only for the same prompt
+    variants = [dict(candidate, priorityLocation=''), {k: v for k, v in candidate.items() if k != 'priorityLocation'},
+                dict({k: v for k, v in candidate.items() if k != 'priorityLocation'}, priorities={'location': '1'}),
+                dict(candidate, priorityLocation='4')]
+    keys, prompts = [], []
+    for variant in variants:
+        recorder = PromptRecorder()
+        run_scoring(recorder, "sequential", [variant])
+        keys.append(backend.make_score_cache_key(USER, variant, False, 75))
+        prompts.append(recorder.prompts[0])
+    checks["key follows prompt"] = all((keys[i] == keys[j]) == (prompts[i] == prompts[j])
+                                       for i in range(len(variants)) for j in range(i + 1, len(variants)))
+    checks["blank vs missing priority"] = keys[0] != keys[1]
+    for name, ok in checks.items():
+        print(f"   {'✅' if ok else '❌'} {name}")
+
+    if all(checks.values()):
+        print(f"   ✅ PASS: Cache key covers exactly the scoring inputs")
+        return True
+    print(f"   ❌ FAIL: Cache key is wrong")
+    return False
+
+
+class FakeGeminiHandler(BaseHTTPRequestHandler):
+    """Minimal keep-alive endpoint that answers like generateContent."""
+    protocol_version = "HTTP/1.1"
+
+    def do_POST(self):
+        self.rfile.read(int(self.headers.get('Content-Length', 0)))
+        answer = json.dumps({'compatibilityScore': 85, 'confidenceLevel': 'High', 'reasoningSummary': 'ok', 'matchAdvice': 'ok'})
+        body = json.dumps({'candidates': [{'content': {'parts': [{'text': answer}]}}]}).encode('utf-8')
+        self.send_response(200)
+        self.send_header('Content-Type', 'application/json')
+        self.send_header('Content-Length', str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def log_message(self, *args):
+        pass
+
+
+def test_8_connection_reuse():
+    """Test that repeated API calls reuse pooled keep-alive connections"""
+    print("\n" + "="*60)
+    print("TEST 8: Pooled HTTP Connection Reuse")
+    print("="*60)
+
+    server = ThreadingHTTPServer(('127.0.0.1', 0), FakeGeminiHandler)
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    url = f"http://127.0.0.1:{server.server_address[1]}/v1beta/models/test:generateContent"
+
+    try:
+        before = backend.get_http_stats()
+        for _ in range(20):
+            payload = {"contents": [{"parts": [{"text": "score"}]}]}
+            result = backend.make_api_call(payload, backend.MATCH_SCHEMA, backend.LLM_SYSTEM_INSTRUCTION, url, is_scoring=True)
+        after = backend.get_http_stats()
+    finally:
+        server.shutdown()
+        server.server_close()
+
+    sent = after['requests'] - before['requests']
+    opened = after['connectionsOpened'] - before['connectionsOpened']
+    print(f"   Last result: {result}")
+    print(f"   Requests: {sent}, connections opened: {opened}, stats: {after}")
+    if result['compatibilityScore'] == 85 and sent == 20 and opened == 1:
+        print(f"   ✅ PASS: One connection served every call")
+        return True
+    print(f"   ❌ FAIL: Connections were not reused")
+    return False
+
+
+def test_9_batched_prompt():
+    """Test that batched mode scores all candidates in one call and maps answers by userId"""
+    print("\n" + "="*60)
+    print("TEST 9: Batched Prompt Scoring")
+    print("="*60)
+
+    candidates = make_candidates(5)
+    batch_stub = StubBatchAPI(drop_ids=['candidate_3'])
+    results, _ = run_scoring(batch_stub, "batched", candidates)
+    single_stub = StubAPI()
+    run_scoring(single_stub, "concurrent", candidates)
+
+    summary = [(r['candidateName'], r['compatibilityScore'], r['error'] is not None) for r in results]
+    print(f"   Results: {summary}")
+    print(f"   API calls: {batch_stub.calls} (vs {len(candidates)}), prompt bytes: {batch_stub.prompt_bytes} (vs {single_stub.prompt_bytes})")
+
+    expected_scores = [90, 89, 88, None, 86]
+    scores_ok = all(expected is None or r['compatibilityScore'] == expected for r, expected in zip(results, expected_scores))
+    fallback_ok = [r['error'] is not None for r in results] == [False, False, False, True, False]
+    if batch_stub.calls == 1 and scores_ok and fallback_ok and batch_stub.prompt_bytes < single_stub.prompt_bytes / 2:
+        print(f"   ✅ PASS: One call, answers mapped by userId, missing candidate used fallback")
+        return True
+    print(f"   ❌ FAIL: Batched scoring did not map or fall back correctly")
+    return False
+
+
+def test_10_compact_prompt():
+    """Test that compact prompts drop unused fields and only sample the full dump to report the bytes saved"""
+    print("\n" + "="*60)
+    print("TEST 10: Compact Prompt Serialization")
+    print("="*60)
+
+    user, candidate = backend.SIMULATED_PROFILES[0], backend.SIMULATED_PROFILES[1]
+    prompts = {}
+    for mode in ["full", "compact"]:
+        recorder = PromptRecorder()
+        original_mode = backend.LLM_PROMPT_MODE
+        backend.LLM_PROMPT_MODE = mode
+        try:
+            run_scoring(recorder, "sequential", [candidate])
+        finally:
+            backend.LLM_PROMPT_MODE = original_mode
+        prompts[mode] = recorder.prompts[0]
+
+    # Six compact prompts with one in three sampled: only two pay for the full dump
+    original_stats, original_to_dict = backend._prompt_stats, backend.profile_to_dict
+    full_dumps = []
+    backend._prompt_stats = backend.PromptStats(sample_every=3)
+    backend.profile_to_dict = lambda profile: full_dumps.append(1) or original_to_dict(profile)
+    try:
+        run_scoring(PromptRecorder(), "sequential", make_candidates(6))
+        stats = backend.get_prompt_stats().stats()
+    finally:
+        backend._prompt_stats, backend.profile_to_dict = original_stats, original_to_dict
+
+    projected = backend.project_prompt_profile(user)
+    full_bytes, compact_bytes = len(prompts['full']), len(prompts['compact'])
+    print(f"   Full prompt: {full_bytes} bytes, compact prompt: {compact_bytes} bytes")
+    print(f"   Projected fields: {list(projected)}")
+    print(f"   Prompt stats: {stats}, profiles fully dumped: {len(full_dumps)}")
+
+    leaked = [field for field in ['userId', 'name', 'campusProximity', 'genderPref', 'priorityLocation'] if f'"{field}"' in prompts['compact']]
+    sampled_ok = stats['calls'] == 6 and stats['sampledCalls'] == 2 and len(full_dumps) == 4
+    if compact_bytes < full_bytes * 0.8 and not leaked and stats['savedBytes'] > 0 and sampled_ok:
+        print(f"   ✅ PASS: Compact prompt is {100 - compact_bytes * 100 // full_bytes}% smaller")
+        return True
+    print(f"   ❌ FAIL: Compact prompt too large, leaked fields {leaked} or savings not sampled")
+    return False
+
+
+class SlowBatchAPI(StubBatchAPI):
+    """StubBatchAPI that takes API_DELAY to answer, so concurrent batches overlap."""
+
+    def __call__(self, payload, schema, system_instruction, url, is_scoring=False):
+        time.sleep(API_DELAY)
+        return super().__call__(payload, schema, system_instruction, url, is_scoring)
+
+
+def test_11_in_flight_pairs_shared():
+    """Test that identical pairs requested at the same time are sent to the API once"""
+    print("\n" + "="*60)
+    print("TEST 11: Identical In-Flight Pairs Shared")
+    print("="*60)
+
+    candidates = make_candidates(3)
+    users = 4
+    outcomes = {}
+    for mode, stub in [("concurrent", StubAPI()), ("batched", SlowBatchAPI())]:
+        original_call, original_mode, original_cache = backend.make_api_call, backend.LLM_SCORING_MODE, backend.get_score_cache()
+        backend.make_api_call, backend.LLM_SCORING_MODE = stub, mode
+        cache = backend.ScoreCache(path=None)
+        backend.set_score_cache(cache)
+        results = [None] * users
+
+        def run(slot):
+            results[slot] = backend.score_top_candidates(USER, candidates, 75)
+
+        try:
+            threads = [threading.Thread(target=run, args=(slot,)) for slot in range(users)]
+            for thread in threads:
+                thread.start()
+            for thread in threads:
+                thread.join()
+        finally:
+            backend.make_api_call, backend.LLM_SCORING_MODE = original_call, original_mode
+            backend.set_score_cache(original_cache)
+
+        scores = [[(r['candidateName'], r['compatibilityScore'], r['error']) for r in result] for result in results]
+        outcomes[mode] = (stub.calls, cache.stats()['sharedCalls'], all(s == scores[0] for s in scores) and scores[0][0][2] is None)
+        print(f"   {mode}: {users} users x {len(candidates)} candidates -> {stub.calls} API calls, "
+              f"{outcomes[mode][1]} shared, identical API results: {outcomes[mode][2]}")
+
+    if outcomes["concurrent"][0] == len(candidates) and outcomes["batched"][0] == 1 and all(same for _, _, same in outcomes.values()):
+        print(f"   ✅ PASS: Each pair sent once, every user got the API answer")
+        return True
+    print(f"   ❌ FAIL: Identical pairs were sent more than once")
+    return False
+
+
+def test_12_http_stats_survive_pool_eviction():
+    """Test that HTTP counters stay cumulative when calls spread over more hosts than the session keeps pools for"""
+    print("\n" + "="*60)
+    print("TEST 12: HTTP Stats Across Evicted Pools")
+    print("="*60)
+
+    # The session keeps 4 host pools; round-robin over 6 servers evicts a pool (and its connection) on every call
+    servers = [ThreadingHTTPServer(('127.0.0.1', 0), FakeGeminiHandler) for _ in range(6)]
+    for server in servers:
+        threading.Thread(target=server.serve_forever, daemon=True).start()
+    urls = [f"http://127.0.0.1:{server.server_address[1]}/v1beta/models/test:generateContent" for server in servers]
+
+    snapshots = [backend.get_http_stats()]
+    try:
+        for _ in range(3):
+            for url in urls:
+                payload = {"contents": [{"parts": [{"text": "score"}]}]}
+                backend.make_api_call(payload, backend.MATCH_SCHEMA, backend.LLM_SYSTEM_INSTRUCTION, url, is_scoring=True)
+                snapshots.append(backend.get_http_stats())
+    finally:
+        for server in servers:
+            server.shutdown()
+            server.server_close()
+
+    keys = ['requests', 'connectionsOpened', 'connectionsReused']
+    monotonic = all(later[k] >= earlier[k] for earlier, later in zip(snapshots, snapshots[1:]) for k in keys)
+    sent = snapshots[-1]['requests'] - snapshots[0]['requests']
+    opened = snapshots[-1]['connectionsOpened'] - snapshots[0]['connectionsOpened']
+    print(f"   Requests: {sent}, connections opened: {opened}, never decreased: {monotonic}")
+    if monotonic and sent == 18 and opened == 18:
+        print(f"   ✅ PASS: Evicted pools' requests and connections are still counted")
+        return True
+    print(f"   ❌ FAIL: HTTP stats lost counts from evicted pools")
+    return False
+
+
+# Run all tests
+if __name__ == "__main__":
+    print("\n" + "="*60)
+    print("LLM SCORING TEST SUITE")
+    print("="*60)
+
+    tests = [
+        ("Concurrent Scoring Latency", test_1_concurrent_latency),
+        ("Concurrent Results vs Sequential Results", test_2_same_results_as_sequential),
+        ("Per-Candidate Fallback", test_3_per_candidate_fallback),
+        ("Concurrency Limit", test_4_concurrency_limit),
+        ("Repeat Submission Uses Score Cache", test_5_repeat_submission_cached),
+        ("Disk Tier and TTL", test_6_disk_tier_and_ttl),
+        ("Score Cache Key", test_7_cache_key_fields),
+        ("Pooled HTTP Connection Reuse", test_8_connection_reuse),
+        ("Batched Prompt Scoring", test_9_batched_prompt),
+        ("Compact Prompt Serialization", test_10_compact_prompt),
+        ("Identical In-Flight Pairs Shared", test_11_in_flight_pairs_shared),
+        ("HTTP Stats Across Evicted Pools", test_12_http_stats_survive_pool_eviction),
+    ]
+
+    results = []
+    for name, test_func in tests:
+        try:
+            result = test_func()
+            results.append((name, result))
+        except Exception as e:
+            print(f"\n   ❌ ERROR: {str(e)}")
+            import traceback
+            traceback.print_exc()
+            results.append((name, False))
+
+    # Summary
+    print("\n" + "="*60)
+    print("SUMMARY")
+    print("="*60)
+
+    passed = sum(1 for _, r in results if r)
+    total = len(results)
+
+    for name, result in results:
+        status = "✅ PASS" if result else "❌ FAIL"
+        print(f"{status} - {name}")
+
+    print(f"\nTotal: {passed}/{total} tests passed")
+    print("="*60 + "\n")
@@ -0,0 +1,446 @@
+#!/usr/bin/env python3
+"""
+Pipeline test suite - runs score_and_rank_matches end to end with the API offline (fallback scoring only)
+"""
+
+import sys
+import os
+import io
+import json
+import random
+import logging
+import contextvars
+import numpy as np
+sys.path.insert(0, os.path.dirname(__file__))
+
+import HackUmass_back_end as backend
+
+USER = {
+    'userId': 'test', 'name': 'Test User', 'major': 'Computer Science', 'college': 'General/Other',
+    'roomType': 'double', 'studentYear': 'upperclassmen',
+    'sleepSchedule': 'balanced', 'tidiness': 'tidy', 'noiseLevel': 'quiet', 'socialLevel': 'moderately-social',
+}
+
+
+def offline_api(*args, **kwargs):
+    raise ConnectionError("API offline for tests")
+
+
+def run_offline(profile, store=None, patches=None):
+    """Runs the full pipeline with the API offline, optionally on a custom candidate store and with extra patches."""
+    patches = dict(patches or {}, make_api_call=offline_api)
+    originals = {name: getattr(backend, name) for name in patches}
+    original_store = backend.get_candidate_store()
+    for name, value in patches.items():
+        setattr(backend, name, value)
+    if store is not None:
+        backend.set_candidate_store(store)
+    try:
+        return backend.score_and_rank_matches(dict(profile), profile['userId'])
+    finally:
+        for name, value in originals.items():
+            setattr(backend, name, value)
+        backend.set_candidate_store(original_store)
+
+
+def scarce_alternatives_store():
+    """One candidate in the user's recommended area and one compatible candidate elsewhere."""
+    recommended = run_offline(USER)['dorm_recommendation']
+    other_area = next(area for area in ['Central', 'Southwest', 'Orchard Hill'] if area != recommended)
+    traits = {k: USER[k] for k in ['sleepSchedule', 'tidiness', 'noiseLevel', 'socialLevel']}
+    return backend.CandidateStore([
+        dict(traits, userId='primary', name='Primary Candidate', dormArea=recommended, roomType='double',
+             yearPref='upperclassmen', studentYear='upperclassmen'),
+        dict(traits, userId='alternative', name='Alternative Candidate', dormArea=other_area, roomType='double',
+             yearPref='upperclassmen', studentYear='upperclassmen'),
+    ])
+
+
+def test_1_alternatives_computed_once():
+    """Test that the all-area alternative search runs once per request"""
+    print("\n" + "="*60)
+    print("TEST 1: Alternative Search Memoized Per Request")
+    print("="*60)
+
+    store = scarce_alternatives_store()
+    calls = []
+    original_find = backend.find_alternative_candidates
+
+    def counting_find(*args, **kwargs):
+        calls.append(args)
+        return original_find(*args, **kwargs)
+
+    def uncached_alternatives(context, min_threshold=75):
+        return counting_find(context.current_profile, context.current_user_id, min_threshold)
+
+    original_method = backend.MatchingContext.alternative_candidates
+    backend.MatchingContext.alternative_candidates = uncached_alternatives
+    try:
+        uncached = run_offline(USER, store)
+    finally:
+        backend.MatchingContext.alternative_candidates = original_method
+    uncached_calls = len(calls)
+
+    calls.clear()
+    cached = run_offline(USER, store, {'find_alternative_candidates': counting_find})
+
+    print(f"   Alternative searches: {uncached_calls} without the context, {len(calls)} with it")
+    if len(calls) == 1 and uncached_calls > 1 and json.dumps(cached, sort_keys=True) == json.dumps(uncached, sort_keys=True):
+        print(f"   ✅ PASS: One search per request, identical results")
+        return True
+    print(f"   ❌ FAIL: Alternative search repeated or results changed")
+    return False
+
+
+def full_sort_ranking(matches, limit=None):
+    """The ranking before top-K selection: a full stable sort, whatever the limit."""
+    return sorted(matches, key=lambda m: m['compatibilityScore'], reverse=True)
+
+
+def large_store(count=6000):
+    """SIMULATED_PROFILES answer sheets repeated under new ids, so almost every score is a tie."""
+    return backend.CandidateStore(
+        dict(backend.SIMULATED_PROFILES[i % len(backend.SIMULATED_PROFILES)], userId=f"applicant_{i}", name=f"Applicant {i}")
+        for i in range(count)
+    )
+
+
+def test_2_top_k_matches_stable_sort():
+    """Test that top_k_indices and rank_matches agree with a stable descending sort"""
+    print("\n" + "="*60)
+    print("TEST 2: Top-K Selection vs Stable Sort")
+    print("="*60)
+
+    rng = random.Random(5)
+    mismatches = 0
+    for trial in range(200):
+        scores = np.array([rng.choice([0, 75, 77, 80]) for _ in range(rng.randint(0, 60))], dtype=np.int32)
+        k = rng.randint(0, 70)
+        expected = sorted(range(len(scores)), key=lambda i: -scores[i])[:k]
+        mismatches += backend.top_k_indices(scores, k).tolist() != expected
+
+        matches = [{'compatibilityScore': int(score), 'id': i} for i, score in enumerate(scores)]
+        ranked = backend.rank_matches(matches, k)
+        top_ids = [m['id'] for m in ranked[:k]]
+        rest_ids = [m['id'] for m in ranked[k:]]
+        mismatches += top_ids != expected or rest_ids != [i for i in range(len(scores)) if i not in expected]
+
+    print(f"   200 random score lists with heavy ties, {mismatches} mismatches")
+    if mismatches == 0:
+        print(f"   ✅ PASS: Ties broken by position, like a stable sort")
+        return True
+    print(f"   ❌ FAIL: Top-K order differs from a stable sort")
+    return False
+
+
+def test_3_top_k_pipeline_unchanged():
+    """Test that top-K ranking returns the same matches as full sorting on a large store"""
+    print("\n" + "="*60)
+    print("TEST 3: Top-K Ranking vs Full Sort Pipeline")
+    print("="*60)
+
+    store = large_store()
+    full_sort = {'rank_matches': full_sort_ranking, 'top_k_indices': lambda scores, k: np.argsort(-scores, kind='stable')[:k]}
+    differences = []
+    for room_type in ['double', 'triple', 'quad']:
+        for year in ['first-years', 'upperclassmen']:
+            profile = dict(USER, roomType=room_type, studentYear=year)
+            ranked = run_offline(profile, store)
+            reference = run_offline(profile, store, full_sort)
+            if json.dumps(ranked, sort_keys=True) != json.dumps(reference, sort_keys=True):
+                differences.append(f"{room_type}/{year}")
+
+    print(f"   {len(store)} candidates, 6 profiles, differences: {differences or 'none'}")
+    if not differences:
+        print(f"   ✅ PASS: Same matches as full sorting")
+        return True
+    print(f"   ❌ FAIL: Top-K ranking changed the results")
+    return False
+
+
+def test_4_ineligible_candidates_not_scored():
+    """Test that candidates failing the user's logistical constraints never reach API scoring"""
+    print("\n" + "="*60)
+    print("TEST 4: Logistical Constraints Applied Before Scoring")
+    print("="*60)
+
+    user = dict(USER, genderInclusivePref='single-gender')
+    recommended = run_offline(user)['dorm_recommendation']
+    traits = {k: USER[k] for k in ['sleepSchedule', 'tidiness', 'noiseLevel', 'socialLevel']}
+    shared = dict(dormArea=recommended, roomType='double', yearPref='upperclassmen', studentYear='upperclassmen')
+    # Perfect trait matches who prefer gender-inclusive housing, then weaker eligible candidates
+    ineligible = [dict(traits, **shared, userId=f"gih_{i}", name=f"GIH {i}", genderInclusivePref='gender-inclusive')
+                  for i in range(backend.MAX_CANDIDATES_TO_SCORE)]
+    eligible = [dict(traits, **shared, userId=f"ok_{i}", name=f"Eligible {i}", socialLevel='very-social')
+                for i in range(3)]
+    store = backend.CandidateStore(ineligible + eligible)
+
+    sent = []
+    original_score_top = backend.score_top_candidates
+
+    def recording_score_top(current_profile, candidates, min_threshold, on_result=None):
+        sent.extend(candidate.get('name') for candidate in candidates)
+        return original_score_top(current_profile, candidates, min_threshold, on_result)
+
+    result = run_offline(user, store, {'score_top_candidates': recording_score_top})
+    returned = [m['candidateName'] for m in result['ranked_matches']]
+
+    print(f"   Sent for API scoring: {sent}")
+    print(f"   Returned: {returned}")
+    if sent and all(name.startswith('Eligible') for name in sent) and returned and all(name.startswith('Eligible') for name in returned):
+        print(f"   ✅ PASS: API slots go to eligible candidates only")
+        return True
+    print(f"   ❌ FAIL: Ineligible candidates were scored")
+    return False
+
+
+def cohort_profiles():
+    """Every room type, year and noise preference, with lifestyle answers shared across users."""
+    return [
+        dict(USER, userId=f"cohort_{i}", roomType=room_type, studentYear=year, noiseLevel=noise)
+        for i, (room_type, year, noise) in enumerate(
+            (r, y, n) for r in ['double', 'triple', 'quad'] for y in ['first-years', 'upperclassmen'] for n in ['quiet', 'very-quiet'])
+    ]
+
+
+def test_5_cohort_matches_individual_runs():
+    """Test that a cohort run returns what matching each user alone returns"""
+    print("\n" + "="*60)
+    print("TEST 5: Cohort Run vs Individual Runs")
+    print("="*60)
+
+    profiles = cohort_profiles()
+    individual = [run_offline(profile) for profile in profiles]
+
+    scorers = []
+    original_scorer = backend.CohortScorer
+
+    class RecordingScorer(original_scorer):
+        def __init__(self, *args, **kwargs):
+            super().__init__(*args, **kwargs)
+            scorers.append(self)
+
+    original_call = backend.make_api_call
+    backend.make_api_call, backend.CohortScorer = offline_api, RecordingScorer
+    try:
+        cohort = dict(backend.score_and_rank_cohort([dict(p) for p in profiles]))
+    finally:
+        backend.make_api_call, backend.CohortScorer = original_call, original_scorer
+
+    same = [json.dumps(cohort[i], sort_keys=True) == json.dumps(individual[i], sort_keys=True) for i in range(len(profiles))]
+    rows = len(scorers[0]) if scorers else None
+    print(f"   {len(profiles)} users, {sum(same)} identical to individual runs, {len(scorers)} scorer, {rows} fallback score rows")
+    if all(same) and len(cohort) == len(profiles) and len(scorers) == 1 and rows == 2:
+        print(f"   ✅ PASS: One shared scoring pass per distinct answer set, same results")
+        return True
+    print(f"   ❌ FAIL: Cohort results differ or scoring was not shared")
+    return False
+
+
+def test_6_progress_events():
+    """Test that a fallback ranking is reported before the API answers, then each API score, then the same final result"""
+    print("\n" + "="*60)
+    print("TEST 6: Progress Events While API Scoring")
+    print("="*60)
+
+    def perfect_api(*args, **kwargs):
+        return {'compatibilityScore': 99, 'confidenceLevel': 'High', 'reasoningSummary': 'Stubbed API score.', 'matchAdvice': 'None.'}
+
+    events = []
+    original_call, original_cache = backend.make_api_call, backend.get_score_cache()
+    backend.make_api_call = perfect_api
+    try:
+        backend.set_score_cache(backend.ScoreCache(path=None))
+        plain = backend.score_and_rank_matches(dict(USER), USER['userId'])
+        backend.set_score_cache(backend.ScoreCache(path=None))
+        streamed = backend.score_and_rank_matches(dict(USER), USER['userId'], None, lambda kind, payload: events.append((kind, payload)))
+    finally:
+        backend.make_api_call = original_call
+        backend.set_score_cache(original_cache)
+
+    kinds = [kind for kind, _ in events]
+    preliminary = events[0][1] if events else {}
+    refinements = [payload for kind, payload in events if kind == 'refinement']
+    print(f"   Events: {kinds}")
+    print(f"   Preliminary scores: {[m['compatibilityScore'] for m in preliminary.get('ranked_matches', [])]}")
+    print(f"   Final scores: {[m['compatibilityScore'] for m in streamed['ranked_matches']]}")
+    if (kinds and kinds[0] == 'preliminary' and kinds[1:] == ['refinement'] * len(refinements)
+            and len(refinements) == refinements[0]['total'] and {r['match']['compatibilityScore'] for r in refinements} == {99}
+            and all(m['compatibilityScore'] < 99 for m in preliminary['ranked_matches'])
+            and json.dumps(streamed, sort_keys=True) == json.dumps(plain, sort_keys=True)):
+        print(f"   ✅ PASS: Fallback ranking first, one refinement per API score, final result unchanged")
+        return True
+    print(f"   ❌ FAIL: Unexpected events")
+    return False
+
+
+def capture_logs(level, run):
+    """Runs `run` under a new request ID with JSON logs at `level` and returns (request ID, parsed log lines)."""
+    stream = io.StringIO()
+    backend.configure_logging(level, "json", stream)
+    context = contextvars.copy_context()
+    try:
+        request_id = context.run(backend.set_request_id)
+        context.run(run)
+    finally:
+        backend.stop_logging()
+        backend.logger.handlers, backend.logger.propagate = [], True
+        backend.logger.setLevel(logging.NOTSET)
+    return request_id, [json.loads(line) for line in stream.getvalue().splitlines()]
+
+
+def test_7_leveled_request_logs():
+    """Test that logs carry the request ID from every thread, and that the default level writes nothing for a clean run"""
+    print("\n" + "="*60)
+    print("TEST 7: Leveled Logs With Request IDs")
+    print("="*60)
+
+    def perfect_api(*args, **kwargs):
+        return {'compatibilityScore': 99, 'confidenceLevel': 'High', 'reasoningSummary': 'Stubbed API score.', 'matchAdvice': 'None.'}
+
+    def clean_run():
+        original_call, original_cache = backend.make_api_call, backend.get_score_cache()
+        backend.make_api_call = perfect_api
+        backend.set_score_cache(backend.ScoreCache(path=None))
+        try:
+            backend.score_and_rank_matches(dict(USER), USER['userId'])
+        finally:
+            backend.make_api_call = original_call
+            backend.set_score_cache(original_cache)
+
+    request_id, debug_lines = capture_logs("DEBUG", lambda: run_offline(USER))
+    _, quiet_lines = capture_logs("WARNING", clean_run)
+
+    levels = {line['level'] for line in debug_lines}
+    ids = {line['requestId'] for line in debug_lines}
+    print(f"   DEBUG run: {len(debug_lines)} lines, levels {sorted(levels)}, request IDs {ids}")
+    print(f"   WARNING run without API errors: {len(quiet_lines)} lines")
+    if debug_lines and ids == {request_id} and {'DEBUG', 'WARNING'} <= levels and not quiet_lines:
+        print(f"   ✅ PASS: Every line tagged with the request ID, nothing written at the default level")
+        return True
+    print(f"   ❌ FAIL: Missing request IDs or unexpected output")
+    return False
+
+
+def test_8_entries_built_for_usable_rows():
+    """Test that match entries are built only for the candidates ranking and group formation can use, with the same results"""
+    print("\n" + "="*60)
+    print("TEST 8: Match Entries Built Only Where Used")
+    print("="*60)
+
+    store = large_store()
+    built = []
+
+    def counting(build):
+        def counted(candidates, scores):
+            entries = build(candidates, scores)
+            built.append(len(entries))
+            return entries
+        return counted
+
+    counting_builds = {name: counting(getattr(backend, name)) for name in ['build_quick_match_results', 'build_alternative_match_results']}
+    every_row = dict(counting_builds, MATCHES_SHOWN=len(store),
+                     room_group_candidates=lambda candidates, scores, size: np.arange(len(candidates)))
+    differences = []
+    pruned_entries = every_entries = 0
+    for room_type in ['double', 'triple', 'quad']:
+        for year in ['first-years', 'upperclassmen']:
+            profile = dict(USER, roomType=room_type, studentYear=year)
+            built.clear()
+            pruned = run_offline(profile, store, counting_builds)
+            pruned_entries += sum(built)
+            built.clear()
+            reference = run_offline(profile, store, every_row)
+            every_entries += sum(built)
+            if json.dumps(pruned, sort_keys=True) != json.dumps(reference, sort_keys=True):
+                differences.append(f"{room_type}/{year}")
+
+    print(f"   {len(store)} candidates, 6 profiles: {pruned_entries} entries built instead of {every_entries}")
+    print(f"   Differences: {differences or 'none'}")
+    if not differences and pruned_entries * 20 < every_entries:
+        print(f"   ✅ PASS: Same matches from a small fraction of the entries")
+        return True
+    print(f"   ❌ FAIL: Results changed or entries built for every candidate")
+    return False
+
+
+def test_9_single_request_scores_its_candidates():
+    """Test that a single request scores only its candidate batches, and a cohort run shares whole-store rows"""
+    print("\n" + "="*60)
+    print("TEST 9: Per-Request Scoring Stays O(candidates)")
+    print("="*60)
+
+    store = large_store()
+    scored = []
+    original_scores = backend.batch_fallback_scores
+
+    def recording_scores(profile, trait_codes):
+        scored.append(len(trait_codes))
+        return original_scores(profile, trait_codes)
+
+    single = run_offline(dict(USER), store, {'batch_fallback_scores': recording_scores})
+    single_rows = list(scored)
+
+    scored.clear()
+    original_store, original_call = backend.get_candidate_store(), backend.make_api_call
+    backend.set_candidate_store(store)
+    backend.make_api_call, backend.batch_fallback_scores = offline_api, recording_scores
+    try:
+        cohort = dict(backend.score_and_rank_cohort([dict(USER), dict(USER, userId='test_2')]))
+    finally:
+        backend.make_api_call, backend.batch_fallback_scores = original_call, original_scores
+        backend.set_candidate_store(original_store)
+
+    print(f"   Single request scored batches of {single_rows} rows ({len(store)} in the store)")
+    print(f"   Cohort of 2 with the same answers scored {scored}")
+    if (single['ranked_matches'] and single_rows and max(single_rows) < len(store) and scored == [len(store)]
+            and json.dumps(cohort[0]['ranked_matches'], sort_keys=True) == json.dumps(single['ranked_matches'], sort_keys=True)):
+        print(f"   ✅ PASS: Requests score their own candidates; the cohort scored the store once")
+        return True
+    print(f"   ❌ FAIL: A single request scored the whole store, or the cohort did not share its scores")
+    return False
+
+
+# Run all tests
+if __name__ == "__main__":
+    print("\n" + "="*60)
+    print("PIPELINE TEST SUITE")
+    print("="*60)
+
+    tests = [
+        ("Alternative Search Memoized Per Request", test_1_alternatives_computed_once),
+        ("Top-K Selection vs Stable Sort", test_2_top_k_matches_stable_sort),
+        ("Top-K Ranking vs Full Sort Pipeline", test_3_top_k_pipeline_unchanged),
+        ("Logistical Constraints Applied Before Scoring", test_4_ineligible_candidates_not_scored),
+        ("Cohort Run vs Individual Runs", test_5_cohort_matches_individual_runs),
+        ("Progress Events While API Scoring", test_6_progress_events),
+        ("Leveled Logs With Request IDs", test_7_leveled_request_logs),
+        ("Match Entries Built Only Where Used", test_8_entries_built_for_usable_rows),
+        ("Per-Request Scoring Stays O(candidates)", test_9_single_request_scores_its_candidates),
+    ]
+
+    results = []
+    for name, test_func in tests:
+        try:
+            result = test_func()
+            results.append((name, result))
+        except Exception as e:
+            print(f"\n   ❌ ERROR: {str(e)}")
+            import traceback
+            traceback.print_exc()
+            results.append((name, False))
+
+    # Summary
+    print("\n" + "="*60)
+    print("SUMMARY")
+    print("="*60)
+
+    passed = sum(1 for _, r in results if r)
+    total = len(results)
+
+    for name, result in results:
+        status = "✅ PASS" if result else "❌ FAIL"
+        print(f"{status} - {name}")
+
+    print(f"\nTotal: {passed}/{total} tests passed")
+    print("="*60 + "\n")
@@ -0,0 +1,164 @@
+#!/usr/bin/env python3
+"""
+Synthetic applicant test suite - checks generated pools are valid, reproducible, realistic and fast to write
+"""
+
+import sys
+import os
+import time
+import shutil
+import tempfile
+from collections import Counter
+sys.path.insert(0, os.path.dirname(__file__))
+
+import numpy as np
+
+import HackUmass_back_end as backend
+import synthetic_applicants as synthetic
+
+MODEL = synthetic.default_applicant_model()
+
+
+def share(profiles, field, value):
+    return sum(1 for p in profiles if p.get(field) == value) / len(profiles)
+
+
+def test_1_profiles_are_schema_valid():
+    """Test that generated profiles pass workbook validation and the store's area/year/room rules"""
+    print("\n" + "="*60)
+    print("TEST 1: Schema-Valid Profiles")
+    print("="*60)
+
+    profiles = list(synthetic.generate_applicants(20000, seed=1, model=MODEL))
+    rejected = Counter(reason for _, reason in (backend.normalize_workbook_profile(p) for p in profiles) if reason)
+    bad_rooms = sum(1 for p in profiles if (p['roomType'] == 'triple' and p['dormArea'] not in backend.TRIPLE_ROOM_AREAS)
+                    or (p['roomType'] == 'quad' and p['dormArea'] not in backend.QUAD_ROOM_AREAS))
+    bad_years = sum(1 for p in profiles if p['studentYear'] == 'first-years' and p['dormArea'].lower() in backend.RESTRICTED_UPPERCLASS_AREAS)
+    bad_traits = sum(1 for p in profiles for trait, values in backend.FALLBACK_TRAIT_VALUES.items() if p[trait] not in values)
+    store = backend.CandidateStore(profiles)
+
+    print(f"   Rejected: {dict(rejected)}, bad rooms: {bad_rooms}, first-years in North/Sylvan: {bad_years}, bad traits: {bad_traits}")
+    print(f"   Store: {len(store)} profiles, fields per profile: {len(profiles[0])}")
+    if not rejected and not bad_rooms and not bad_years and not bad_traits and len(store) == 20000:
+        print(f"   ✅ PASS: Every profile is valid")
+        return True
+    print(f"   ❌ FAIL: Invalid profiles generated")
+    return False
+
+
+def test_2_reproducible():
+    """Test that a seed always gives the same applicants and a larger count only appends"""
+    print("\n" + "="*60)
+    print("TEST 2: Reproducible Pools")
+    print("="*60)
+
+    small = list(synthetic.generate_applicants(1000, seed=5, model=MODEL))
+    large = list(synthetic.generate_applicants(100000, seed=5, model=MODEL))
+    other = list(synthetic.generate_applicants(1000, seed=6, model=MODEL))
+
+    same = sum(a == b for a, b in zip(small, large))
+    differ = sum(a != b for a, b in zip(small, other))
+    print(f"   Seed 5, 1,000 vs first 1,000 of 100,000: {same} identical; seed 5 vs 6: {differ} differ")
+    if same == 1000 and differ > 900:
+        print(f"   ✅ PASS: Same seed, same applicants")
+        return True
+    print(f"   ❌ FAIL: Generation is not reproducible")
+    return False
+
+
+def test_3_learned_distributions():
+    """Test that marginals follow the known profiles and trait correlations are kept"""
+    print("\n" + "="*60)
+    print("TEST 3: Learned Distributions")
+    print("="*60)
+
+    known = backend.SIMULATED_PROFILES
+    profiles = list(synthetic.generate_applicants(50000, seed=2, model=MODEL))
+    failures = []
+    for field in ('sleepSchedule', 'tidiness', 'noiseLevel', 'socialLevel', 'dormArea', 'studentYear'):
+        values = set(p.get(field) for p in known) | set(p[field] for p in profiles)
+        distance = sum(abs(share(known, field, v) - share(profiles, field, v)) for v in values) / 2
+        print(f"   {field:<14} total variation vs known profiles: {distance:.3f}")
+        if distance > 0.2:
+            failures.append(field)
+
+    # Early birds among the known profiles are quieter than average; the generated pool should agree
+    early = [p for p in profiles if p['sleepSchedule'] == 'early-bird']
+    quiet_overall = share(profiles, 'noiseLevel', 'quiet') + share(profiles, 'noiseLevel', 'very-quiet')
+    quiet_early = share(early, 'noiseLevel', 'quiet') + share(early, 'noiseLevel', 'very-quiet')
+    print(f"   Quiet or very quiet: {quiet_early:.2f} of early birds vs {quiet_overall:.2f} overall")
+    if quiet_early < quiet_overall + 0.1:
+        failures.append('sleepSchedule → noiseLevel')
+
+    if not failures:
+        print(f"   ✅ PASS: Marginals and correlations follow the known profiles")
+        return True
+    print(f"   ❌ FAIL: {failures}")
+    return False
+
+
+def test_4_streamed_store():
+    """Test that a million applicants are written to the columnar store quickly and load back as generated"""
+    print("\n" + "="*60)
+    print("TEST 4: 1,000,000 Applicants to Disk")
+    print("="*60)
+
+    directory = os.path.join(tempfile.mkdtemp(), "pool")
+    try:
+        start = time.perf_counter()
+        manifest = synthetic.write_applicant_store(directory, 1000000, seed=3, model=MODEL)
+        elapsed = time.perf_counter() - start
+        data = synthetic.load_applicant_store(directory)
+        loaded = [dict(zip(data.profiles.columns, values)) for values in zip(*(
+            data.profiles.values[c][np.asarray(data.profiles.codes[c][-3:])].tolist() for c in data.profiles.columns))]
+        expected = list(synthetic.generate_applicants(1000000, seed=3, model=MODEL))[-3:]
+        size_mb = sum(os.path.getsize(os.path.join(directory, "profiles", f)) for f in os.listdir(os.path.join(directory, "profiles"))) / 1e6
+    finally:
+        shutil.rmtree(os.path.dirname(directory), ignore_errors=True)
+
+    print(f"   {manifest['profiles']['rows']:,} rows, {len(manifest['profiles']['columns'])} columns, {size_mb:.0f} MB in {elapsed:.2f}s")
+    if len(data.profiles) == 1000000 and loaded == expected and elapsed < 20:
+        print(f"   ✅ PASS: Store written and read back")
+        return True
+    print(f"   ❌ FAIL: Store mismatch or too slow")
+    return False
+
+
+# Run all tests
+if __name__ == "__main__":
+    print("\n" + "="*60)
+    print("SYNTHETIC APPLICANT TEST SUITE")
+    print("="*60)
+
+    tests = [
+        ("Schema-Valid Profiles", test_1_profiles_are_schema_valid),
+        ("Reproducible Pools", test_2_reproducible),
+        ("Learned Distributions", test_3_learned_distributions),
+        ("Streamed Store", test_4_streamed_store),
+    ]
+
+    results = []
+    for name, test_func in tests:
+        try:
+            result = test_func()
+            results.append((name, result))
+        except Exception as e:
+            print(f"\n   ❌ ERROR: {str(e)}")
+            import traceback
+            traceback.print_exc()
+            results.append((name, False))
+
+    # Summary
+    print("\n" + "="*60)
+    print("SUMMARY")
+    print("="*60)
+
+    passed = sum(1 for _, r in results if r)
+    total = len(results)
+
+    for name, result in results:
+        status = "✅ PASS" if result else "❌ FAIL"
+        print(f"{status} - {name}")
+
+    print(f"\nTotal: {passed}/{total} tests passed")
+    print("="*60 + "\n")